@@ -0,0 +1,73 @@
+"""Attachment save and chunked read throughput from the fake CDN.
+
+Usage::
+
+    python benchmarks/bench_cdn.py --size-mb 256
+"""
+# Stdlib
+import asyncio
+import os
+import random
+import tempfile
+
+# discord.py-test
+import common
+from discord_test.message import Attachment
+from discord_test.state import ConnectionState
+from discord_test.cdn import StopAsyncIteration
+
+URL = 'https://cdn.discordapp.com/attachments/1/2/blob.bin'
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--size-mb', type=int, default=256, help='attachment size')
+    args = p.parse_args()
+
+    size = args.size_mb * 2**20
+    rng = random.Random(args.seed)
+    state = ConnectionState()
+    loop = asyncio.get_event_loop()
+
+    with tempfile.NamedTemporaryFile() as blob, open(os.devnull, 'wb') as sink:
+        block = bytes(rng.getrandbits(8) for _ in range(2**16))
+        for _ in range(size // len(block)):
+            blob.write(block)
+        blob.flush()
+
+        state.cdn.put_file(URL, blob.name)
+        attachment = Attachment(
+            data={'id': 1, 'size': size, 'filename': 'blob.bin', 'url': URL},
+            state=state)
+
+        def save(_):
+            loop.run_until_complete(attachment.save(sink, seek_begin=False))
+
+        @asyncio.coroutine
+        def read_chunks():
+            total = 0
+            it = attachment.iter_chunks(1 << 20)
+            while True:
+                try:
+                    chunk = yield from it.__anext__()
+                except StopAsyncIteration:
+                    return total
+                total += len(chunk)
+
+        print(common.HEADER)
+        scale = '%dMiB' % args.size_mb
+        results = [
+            common.measure('Attachment.save', scale, save, repeat=args.repeat),
+            common.measure('Attachment.iter_chunks (1MiB)', scale,
+                           lambda _: loop.run_until_complete(read_chunks()),
+                           repeat=args.repeat)
+        ]
+        for result in results:
+            print(result, '{0:.0f} MiB/s'.format(args.size_mb / min(result.times)))
+
+        state.cdn.close()
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Streaming members into a large guild through the chunk simulation.
+
+Usage::
+
+    python benchmarks/bench_chunking.py --members 200000
+"""
+# Stdlib
+import asyncio
+import random
+
+# discord.py-test
+import common
+from discord_test.chunker import MemberChunker
+from discord_test.guild import Guild
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--members', type=int, default=200000, help='guild size')
+    args = p.parse_args()
+
+    payload = common.guild_payload(args.members, 250, 250, seed=args.seed)
+    members = payload.pop('members')
+    for key in ('presences', 'voice_states'):
+        payload.pop(key)
+    loop = asyncio.get_event_loop()
+    rng = random.Random(args.seed)
+    prefixes = [m['user']['username'][:5] for m in rng.sample(members, 100)]
+    scale = '%dk' % (args.members // 1000)
+
+    def setup():
+        guild = Guild(data=common.fresh(payload))
+        return guild, MemberChunker(guild, members)
+
+    def stream(pair):
+        guild, chunker = pair
+        loop.run_until_complete(chunker.chunks().flatten())
+        assert guild.chunked
+
+    def queries(pair):
+        _, chunker = pair
+
+        @asyncio.coroutine
+        def run():
+            for prefix in prefixes:
+                yield from chunker.query(prefix, limit=100).flatten()
+
+        loop.run_until_complete(run())
+
+    print(common.HEADER)
+    results = [
+        common.measure('MemberChunker.chunks (full guild)', scale, stream, setup,
+                       repeat=args.repeat),
+        common.measure('MemberChunker.query (100 prefixes)', scale, queries, setup,
+                       repeat=args.repeat)
+    ]
+    for result in results:
+        print(result)
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""DM broadcast: opening DM channels and sending to every member.
+
+Usage::
+
+    python benchmarks/bench_dm.py --members 50000
+"""
+# Stdlib
+import asyncio
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+from discord_test.state import ConnectionState
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--members', type=int, default=50000)
+    args = p.parse_args()
+
+    state = ConnectionState(user={
+        'id': 1,
+        'username': 'broadcaster',
+        'discriminator': '0001',
+        'avatar': None,
+        'bot': True
+    })
+    guild = Guild(
+        data=common.guild_payload(args.members, 10, 10, seed=args.seed), state=state)
+    members = list(guild._members.values())
+    loop = asyncio.get_event_loop()
+
+    def forget_channels():
+        state._private_channels.clear()
+        state._private_channels_by_user.clear()
+
+    @asyncio.coroutine
+    def open_all():
+        for member in members:
+            yield from member.create_dm()
+
+    @asyncio.coroutine
+    def broadcast():
+        for member in members:
+            yield from member.send('scheduled maintenance in 10 minutes')
+
+    scale = '%dk' % (args.members // 1000)
+    print(common.HEADER)
+    results = []
+    for name, func, setup in (
+            ('Member.create_dm (new channels)', open_all, forget_channels),
+            ('Member.create_dm (existing)', open_all, None),
+            ('Member.send (broadcast)', broadcast, None)):
+        results.append(
+            common.measure(name, scale, lambda _: loop.run_until_complete(func()),
+                           setup, repeat=args.repeat))
+        print(results[-1])
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Synthetic guild generation, with and without NumPy.
+
+Fails with a non-zero exit status when the 100k guild takes longer than
+``--budget`` seconds on the fastest backend available.
+
+Usage::
+
+    python benchmarks/bench_generator.py --scales 10k,100k
+"""
+# Stdlib
+import sys
+
+# discord.py-test
+import common
+from discord_test import generator
+from discord_test.generator import GuildGenerator
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0], scales=True)
+    p.add_argument('--budget', type=float, default=1.0, help='seconds for 100k members')
+    args = p.parse_args()
+
+    backends = [('python', False)]
+    if generator.numpy is not None:
+        backends.append(('numpy', True))
+
+    print(common.HEADER)
+    results = []
+    failed = False
+    for scale, (members, roles, channels) in common.scales(args):
+        for name, use_numpy in backends:
+            gen = GuildGenerator(
+                seed=args.seed,
+                members=members,
+                roles=roles,
+                channels=channels,
+                use_numpy=use_numpy)
+            result = common.measure('generate (%s)' % name, scale,
+                                    lambda _: gen.generate(), repeat=args.repeat)
+            results.append(result)
+            print(result)
+            if scale == '100k' and name == backends[-1][0]:
+                failed = min(result.times) > args.budget
+
+    common.report(results, args)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
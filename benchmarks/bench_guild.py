@@ -0,0 +1,237 @@
+"""Guild construction and update path benchmarks.
+
+Usage::
+
+    python benchmarks/bench_guild.py --scales 1k,10k --json before.json
+"""
+# Stdlib
+import itertools
+import random
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+from discord_test.message import Message
+
+
+def _user_payload(user):
+    return {
+        'id': user.id,
+        'username': user.name,
+        'discriminator': user.discriminator,
+        'avatar': user.avatar
+    }
+
+
+def _message_payload(rng, snowflake, channel, members, roles):
+    mentioned = rng.sample(members, min(len(members), 3))
+    role = rng.choice(roles)
+    content = 'hey {0} and <@!{1.id}>, ping <@&{2.id}> in <#{3.id}> @everyone'.format(
+        mentioned[0].mention, mentioned[-1], role, channel)
+    return {
+        'id': snowflake(),
+        'type': 0,
+        'content': content,
+        'pinned': False,
+        'tts': False,
+        'mention_everyone': True,
+        'author': _user_payload(rng.choice(members)),
+        'mentions': [_user_payload(m) for m in mentioned],
+        'mention_roles': [str(role.id)],
+        'edited_timestamp': None
+    }
+
+
+def run_scale(scale, sizes, args):
+    members, roles, channels = sizes
+    payload = common.guild_payload(members, roles, channels, seed=args.seed)
+    guild = Guild(data=common.fresh(payload))
+    rng = random.Random(args.seed)
+    member_list = list(guild._members.values())
+    results = []
+
+    def bench(name, func, setup=None):
+        results.append(
+            common.measure(name, scale, func, setup, repeat=args.repeat))
+        print(results[-1])
+
+    bench('Guild.__init__', lambda data: Guild(data=data),
+          lambda: common.fresh(payload))
+
+    sync = {
+        'large': payload['large'],
+        'presences': payload['presences'],
+        'channels': payload['channels']
+    }
+    bench('Guild._sync', guild._sync, lambda: common.fresh(sync))
+
+    # channels are updated in place, so repeated syncs only pay for changes
+    unchanged = {'channels': payload['channels']}
+    renamed = {
+        'channels': [
+            dict(c, name=c['name'] + '-renamed') if i % 100 == 0 else c
+            for i, c in enumerate(payload['channels'])
+        ]
+    }
+    flip = itertools.cycle((renamed, unchanged))
+    bench('Guild._sync (channels, unchanged)', guild._sync, lambda: unchanged)
+    bench('Guild._sync (channels, 1% renamed)', guild._sync, lambda: next(flip))
+
+    member_payloads = [(guild._members[int(m['user']['id'])], m)
+                       for m in payload['members']]
+
+    def update_roles(_):
+        for member, data in member_payloads:
+            member._update_roles(data)
+
+    bench('Member._update_roles (all members)', update_roles)
+
+    presences = [(guild._members[int(p['user']['id'])], p)
+                 for p in payload['presences']]
+
+    def presence_update(_):
+        for member, data in presences:
+            member._presence_update(data, data['user'])
+
+    bench('Member._presence_update (all members)', presence_update)
+
+    text_channels = guild.text_channels[:5]
+
+    def text_members(_):
+        for channel in text_channels:
+            channel.members
+
+    bench('TextChannel.members (5 channels)', text_members)
+
+    voice_channels = guild.voice_channels
+
+    def voice_members(_):
+        for channel in voice_channels:
+            channel.members
+
+    bench('VoiceChannel.members (all channels)', voice_members)
+
+    # what a few command checks per invocation add up to
+    checks = [(rng.choice(guild.channels), rng.choice(member_list))
+              for _ in range(1000)]
+
+    def permissions_for(_):
+        for channel, member in checks:
+            channel.permissions_for(member)
+
+    bench('permissions_for (1000 checks)', permissions_for)
+
+    bench('Guild.by_category', lambda _: guild.by_category())
+
+    names = []
+    for member in rng.sample(member_list, min(len(member_list), 100)):
+        names.append(member.name)
+        names.append('{0.name}#{0.discriminator}'.format(member))
+    names.append('nobody-has-this-name')
+
+    def member_named(_):
+        for name in names:
+            guild.get_member_named(name)
+
+    bench('Guild.get_member_named (201 lookups)', member_named)
+
+    channel = text_channels[0]
+    snowflake = common.Snowflakes()
+    message_payloads = [
+        _message_payload(rng, snowflake, channel, member_list, guild.roles[1:])
+        for _ in range(100)
+    ]
+
+    def make_messages():
+        return [Message(channel=channel, data=data) for data in message_payloads]
+
+    bench('Message.__init__ (100 messages)', lambda _: make_messages())
+    bench('Message.batch (100 messages)',
+          lambda _: Message.batch(message_payloads, channel=channel))
+
+    # replayed bot logs, embeds and attachments are decoded on first read
+    embed = {
+        'title': 'Moderation log',
+        'description': 'a member was warned',
+        'color': 0xff0000,
+        'fields': [{'name': 'field %d' % i, 'value': 'value', 'inline': True}
+                   for i in range(5)]
+    }
+    embed_payloads = [
+        dict(data, embeds=[embed] * 3, attachments=[{
+            'id': snowflake(),
+            'size': 1024,
+            'filename': 'log.txt',
+            'url': 'https://cdn.discordapp.com/attachments/log.txt'
+        }]) for data in message_payloads
+    ]
+
+    def read_embeds(messages):
+        for message in messages:
+            message.embeds
+            message.attachments
+
+    bench('Message.batch (100 embed messages)',
+          lambda _: Message.batch(embed_payloads, channel=channel))
+    bench('Message.embeds (100 embed messages)', read_embeds,
+          lambda: Message.batch(embed_payloads, channel=channel))
+
+    def clean_content(messages):
+        for message in messages:
+            message.clean_content
+
+    bench('Message.clean_content (100 messages)', clean_content, make_messages)
+
+    # notification fan-out, without @everyone so the roles matter
+    fanout = make_messages()
+    for message in fanout:
+        message.mention_everyone = False
+
+    def mentioned_in(_):
+        for message in fanout[:10]:
+            for member in member_list:
+                member.mentioned_in(message)
+
+    bench('Member.mentioned_in (all members, 10 messages)', mentioned_in)
+
+    def mentioned_members(_):
+        for message in fanout:
+            guild.mentioned_members(message)
+
+    bench('Guild.mentioned_members (100 messages)', mentioned_members)
+
+    # onboarding style mass assignment of one role
+    role = common.drive(guild.create_role(name='onboarded'))
+
+    def strip():
+        common.drive(guild.bulk_remove_roles(member_list, role))
+
+    def add_roles(_):
+        for member in member_list:
+            common.drive(member.add_roles(role))
+
+    bench('Member.add_roles (all members)', add_roles, strip)
+    bench('Guild.bulk_add_roles (all members)',
+          lambda _: common.drive(guild.bulk_add_roles(member_list, role)), strip)
+    guild._remove_role(role)
+
+    # the members without roles that were offline since joining
+    bench('Guild.estimate_pruned_members (7 days)',
+          lambda _: common.drive(guild.estimate_pruned_members(days=7)))
+    bench('Guild.prune_members (7 days)',
+          lambda g: common.drive(g.prune_members(days=7)),
+          lambda: Guild(data=common.fresh(payload)))
+    return results
+
+
+def main():
+    args = common.parser(__doc__.splitlines()[0], scales=True).parse_args()
+    print(common.HEADER)
+    results = []
+    for scale, sizes in common.scales(args):
+        results.extend(run_scale(scale, sizes, args))
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Import time of the package and of single fakes, from ``-X importtime``.
+
+Fails with a non-zero exit status when a bare ``import discord_test``
+takes longer than ``--budget`` milliseconds or loads discord.py, which
+would mean the lazy namespace started importing eagerly. CI runs it as
+the import budget check. Needs Python 3.7, and skips on older versions.
+
+Usage::
+
+    python benchmarks/bench_import.py --repeat 5
+"""
+# Stdlib
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# discord.py-test
+import common
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = ('discord_test', 'discord_test.member', 'discord_test.guild',
+           'discord_test.message')
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def import_times(module):
+    """Returns the cumulative time of ``module`` and the time spent in the
+    package's own modules, both in milliseconds, and the modules loaded."""
+    # the checkout goes first, anything already on the path stays reachable
+    path = os.environ.get('PYTHONPATH')
+    env = dict(os.environ, PYTHONPATH=ROOT if not path else ROOT + os.pathsep + path)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+
+    total = own = 0
+    loaded = set()
+    for match in _LINE.finditer(proc.stderr):
+        own_us, cumulative_us, _, name = match.groups()
+        loaded.add(name)
+        if name.startswith('discord_test'):
+            own += int(own_us)
+        if name == module:
+            total = int(cumulative_us)
+    return total / 1e3, own / 1e3, loaded
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--budget', type=float, default=10.0,
+                   help='milliseconds for a bare import discord_test')
+    args = p.parse_args()
+    if sys.version_info < (3, 7):
+        # nothing to measure, which is not a failure of the budget
+        print('skipped, -X importtime needs Python 3.7 or later')
+        return 0
+
+    print('{0:<24} {1:>16} {2:>16}'.format('module', 'total (ms)', 'own (ms)'))
+    results = []
+    failed = False
+    for target in TARGETS:
+        try:
+            runs = [import_times(target) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            print('{0:<24} failed: {1}'.format(target, e.stderr.strip().splitlines()[-1]))
+            failed = failed or target == 'discord_test'
+            continue
+
+        total = statistics.median(r[0] for r in runs)
+        own = statistics.median(r[1] for r in runs)
+        results.append({'module': target, 'total_ms': total, 'own_ms': own})
+        print('{0:<24} {1:>16.2f} {2:>16.2f}'.format(target, total, own))
+
+        if target == 'discord_test':
+            if total > args.budget:
+                print('  over the %.1f ms budget' % args.budget)
+                failed = True
+            if 'discord' in runs[0][2]:
+                print('  imports discord.py')
+                failed = True
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Anti-raid bursts: banning, checking and listing bans, counting invite uses.
+
+Usage::
+
+    python benchmarks/bench_moderation.py --bans 10000
+"""
+# Stdlib
+import random
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+from discord_test.state import ConnectionState
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--bans', type=int, default=10000)
+    args = p.parse_args()
+
+    state = ConnectionState(user={
+        'id': 1,
+        'username': 'moderator',
+        'discriminator': '0001',
+        'avatar': None,
+        'bot': True
+    })
+    payload = common.guild_payload(args.bans, 10, 10, seed=args.seed)
+    rng = random.Random(args.seed)
+
+    def new_guild():
+        return Guild(data=common.fresh(payload), state=state)
+
+    guild = new_guild()
+    users = [m._user for m in guild._members.values()]
+    checks = [rng.choice(users).id for _ in range(100000)]
+    channel = guild.text_channels[0]
+    invites = [common.drive(channel.create_invite()) for _ in range(100)]
+    joins = [rng.choice(invites).code for _ in range(100000)]
+
+    def ban_all(g):
+        for user in users:
+            common.drive(g.ban(user, reason='raid'))
+
+    def is_banned(_):
+        bans = guild.ban_store
+        for user_id in checks:
+            user_id in bans
+
+    def page_all(_):
+        after = None
+        while True:
+            page = guild.ban_store.page(after=after)
+            if not page:
+                break
+            after = page[-1].user
+
+    def use_invites(_):
+        store = guild.invite_store
+        for code in joins:
+            store.use(code)
+
+    scale = '%dk' % (args.bans // 1000)
+    print(common.HEADER)
+    results = []
+    for name, func, setup in (
+            ('Guild.ban (every member)', ban_all, new_guild),
+            ('BanStore.bulk_add', lambda _: guild.ban_store.bulk_add(users),
+             guild.ban_store.clear),
+            ('user in ban_store (100k checks)', is_banned, None),
+            ('BanStore.page (all pages)', page_all, None),
+            ('InviteStore.use (100k joins)', use_invites, None)):
+        results.append(common.measure(name, scale, func, setup, repeat=args.repeat))
+        print(results[-1])
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
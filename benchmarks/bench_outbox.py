@@ -0,0 +1,51 @@
+"""Outbox capture cost of TextChannel.send and last-message lookups.
+
+Usage::
+
+    python benchmarks/bench_outbox.py --sends 100000
+"""
+# Stdlib
+import asyncio
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--sends', type=int, default=100000)
+    args = p.parse_args()
+
+    guild = Guild(data=common.guild_payload(1000, 20, 50, seed=args.seed))
+    channels = guild.text_channels
+    outbox = guild._state.outbox
+    mention = next(iter(guild._members.values())).mention
+    loop = asyncio.get_event_loop()
+
+    @asyncio.coroutine
+    def send():
+        for index in range(args.sends):
+            yield from channels[index % len(channels)].send(
+                'reply %d to %s' % (index, mention))
+
+    def lookups(_):
+        for _ in range(1000):
+            for channel in channels:
+                outbox.last(channel)
+
+    print(common.HEADER)
+    results = [
+        common.measure('TextChannel.send (%d sends)' % args.sends, 'outbox',
+                       lambda _: loop.run_until_complete(send()), outbox.clear,
+                       repeat=args.repeat),
+        common.measure('Outbox.last (%d lookups)' % (1000 * len(channels)), 'outbox',
+                       lookups, repeat=args.repeat)
+    ]
+    for result in results:
+        print(result)
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Reaction store throughput under bulk injected reaction events.
+
+Usage::
+
+    python benchmarks/bench_reactions.py --scales 10k
+"""
+# Stdlib
+import random
+
+# discord.py-test
+import common
+from discord_test import reaction
+from discord_test.guild import Guild
+from discord_test.message import Message
+
+EMOJIS = ['\N{THUMBS UP SIGN}', '\N{HEAVY BLACK HEART}', '\N{FIRE}', '\N{EYES}',
+          '\N{PARTY POPPER}']
+
+
+def main():
+    args = common.parser(__doc__.splitlines()[0], scales=True).parse_args()
+    print(common.HEADER)
+    results = []
+    for scale, (members, roles, channels) in common.scales(args):
+        guild = Guild(data=common.guild_payload(members, roles, channels, seed=args.seed))
+        channel = guild.text_channels[0]
+        snowflake = common.Snowflakes()
+        rng = random.Random(args.seed)
+        user_ids = list(guild._members)
+        messages = [
+            Message(channel=channel, data={
+                'id': snowflake(), 'type': 0, 'content': 'react to me',
+                'edited_timestamp': None
+            }) for _ in range(10)
+        ]
+        events = [(rng.choice(messages), rng.choice(EMOJIS), rng.choice(user_ids),
+                   rng.random() < 0.8) for _ in range(members)]
+
+        def clear(_=None):
+            for message in messages:
+                message._reactions.clear()
+
+        def lookups(_):
+            for message, emoji, user_id, _ in events:
+                message.has_reacted(emoji, user_id)
+
+        for name, func, setup in (
+                ('reaction.inject (%d events)' % len(events),
+                 lambda _: reaction.inject(events), clear),
+                ('Message.has_reacted (%d checks)' % len(events), lookups, None)):
+            results.append(common.measure(name, scale, func, setup, repeat=args.repeat))
+            print(results[-1])
+
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
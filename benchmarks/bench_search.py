@@ -0,0 +1,70 @@
+"""Indexed queries over a fake message history.
+
+Usage::
+
+    python benchmarks/bench_search.py --messages 100000
+"""
+# Stdlib
+import random
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+from discord_test.message import Message
+from discord_test.search import MessageIndex
+
+WORDS = ('hello world ping pong raid ban kick role stats level xp daily music '
+         'queue skip play pause giveaway winner poll vote help').split()
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--messages', type=int, default=100000)
+    args = p.parse_args()
+
+    guild = Guild(data=common.guild_payload(1000, 20, 20, seed=args.seed))
+    rng = random.Random(args.seed)
+    members = list(guild._members.values())
+    channels = guild.text_channels
+    snowflake = common.Snowflakes()
+
+    messages = []
+    for _ in range(args.messages):
+        # spread the history over roughly a month
+        snowflake.millis += rng.randrange(30000)
+        messages.append(Message(channel=rng.choice(channels), data={
+            'id': snowflake(),
+            'type': 0,
+            'content': ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(1, 12))),
+            'author': {'id': rng.choice(members).id},
+            'mentions': [{'id': m.id} for m in rng.sample(members, rng.randrange(3))],
+            'edited_timestamp': None
+        }))
+
+    index = MessageIndex(messages)
+    middle = messages[len(messages) // 2].id
+    queries = [dict(author=rng.choice(members)) for _ in range(50)]
+    queries += [dict(content='giveaway winner', channel=rng.choice(channels)) for _ in range(50)]
+    queries += [dict(mentions=rng.choice(members), after=middle) for _ in range(50)]
+
+    def indexed(_):
+        for query in queries:
+            index.query(**query)
+
+    def build(_):
+        MessageIndex(messages)
+
+    print(common.HEADER)
+    scale = '%dk msgs' % (args.messages // 1000)
+    results = [
+        common.measure('MessageIndex build', scale, build, repeat=args.repeat),
+        common.measure('MessageIndex.query (150 queries)', scale, indexed,
+                       repeat=args.repeat)
+    ]
+    for result in results:
+        print(result)
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Per-shard event throughput and latency of a fake sharded deployment.
+
+Usage::
+
+    python benchmarks/bench_shards.py --shards 4 --guilds 2000 --processes
+"""
+# Stdlib
+import asyncio
+import random
+
+# discord.py-test
+import common
+from discord_test.shard import ShardCluster
+
+
+@asyncio.coroutine
+def handler(guild, event, data):
+    # a typical command check: resolve the author and their permissions
+    member = guild.get_member(data['user_id'])
+    if member is not None:
+        member.guild_permissions
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--shards', type=int, default=4)
+    p.add_argument('--guilds', type=int, default=2000)
+    p.add_argument('--events', type=int, default=200000)
+    p.add_argument('--rate', type=float, default=None, help='events per second per shard')
+    p.add_argument('--processes', action='store_true', help='one process per shard')
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = [
+        common.guild_payload(20, 5, 5, seed=args.seed + index,
+                             millis=common.BASE_MILLIS + index * 1009)
+        for index in range(args.guilds)
+    ]
+    cluster = ShardCluster(args.shards)
+    cluster.add_guilds(payloads)
+
+    events = []
+    for _ in range(args.events):
+        data = rng.choice(payloads)
+        user = rng.choice(data['members'])['user']
+        events.append((data['id'], 'message', {'user_id': user['id']}))
+
+    for stats in cluster.run(handler, events, processes=args.processes, rate=args.rate):
+        row = stats.to_dict()
+        print('shard {shard_id}: {guilds} guilds, {events} events, {throughput:.0f}/s, '
+              'p50 {p50:.6f}s, p99 {p99:.6f}s'.format(**row))
+
+
+if __name__ == '__main__':
+    main()
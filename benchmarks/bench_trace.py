@@ -0,0 +1,73 @@
+"""Call trace recording overhead and golden trace diffing.
+
+Usage::
+
+    python benchmarks/bench_trace.py --calls 100000
+"""
+# Stdlib
+import random
+
+# discord.py-test
+import common
+from discord_test import trace
+from discord_test.guild import Guild
+from discord_test.message import Message
+
+EMOJIS = ('\N{THUMBS UP SIGN}', '\N{HEAVY BLACK HEART}', '\N{FIRE}', '\N{EYES}')
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--calls', type=int, default=100000)
+    args = p.parse_args()
+
+    guild = Guild(data=common.guild_payload(100, 5, 5, seed=args.seed))
+    state = guild._state
+    channel = guild.text_channels[0]
+    snowflake = common.Snowflakes()
+    messages = [
+        Message(channel=channel, data={'id': snowflake(), 'type': 0, 'content': 'x'})
+        for _ in range(100)
+    ]
+    rng = random.Random(args.seed)
+    calls = [(rng.choice(messages), rng.choice(EMOJIS)) for _ in range(args.calls)]
+
+    def react(_, extra=False):
+        for index, (message, emoji) in enumerate(calls):
+            if extra and index == len(calls) // 2:
+                state.trace.record('Guild.kick', guild.id, (guild.owner_id, ))
+            common.drive(message.add_reaction(emoji))
+            common.drive(message.clear_reactions())
+
+    def untraced(_):
+        state.trace = None
+        react(_)
+
+    def traced(_, extra=False):
+        state.trace = trace.TraceRecorder()
+        react(_, extra)
+        return state.trace.getvalue()
+
+    golden = traced(None)
+    # the same run with one extra call in the middle
+    changed = traced(None, extra=True)
+
+    scale = '%dk calls' % (args.calls // 1000)
+    print(common.HEADER)
+    results = []
+    for name, func in (
+            ('add/clear_reactions, no trace', untraced),
+            ('add/clear_reactions, traced', traced),
+            ('trace.diff (identical)', lambda _: trace.diff(golden, golden)),
+            ('trace.diff (one extra call)', lambda _: trace.diff(golden, changed))):
+        results.append(common.measure(name, scale, func, repeat=args.repeat))
+        print(results[-1])
+    state.trace = None
+
+    overhead = (min(results[1].times) - min(results[0].times)) / (2 * args.calls)
+    print('recording overhead: {0:.2f} us per call'.format(overhead * 1e6))
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
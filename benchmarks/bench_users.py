@@ -0,0 +1,51 @@
+"""Memory of guilds sharing the same users through one user store.
+
+Usage::
+
+    python benchmarks/bench_users.py --scales 10k --guilds 24
+"""
+# Stdlib
+import copy
+import gc
+import tracemalloc
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+from discord_test.state import ConnectionState
+
+
+def build(payload, guilds, state):
+    ret = []
+    for index in range(guilds):
+        data = dict(payload)
+        data['id'] = payload['id'] + index
+        data['channels'] = copy.deepcopy(payload['channels'])
+        ret.append(Guild(data=data, state=state))
+    return ret
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0], scales=True)
+    p.add_argument('--guilds', type=int, default=24, help='guilds sharing the users')
+    args = p.parse_args()
+
+    for scale, (members, roles, channels) in common.scales(args):
+        payload = common.guild_payload(members, roles, channels, seed=args.seed)
+        state = ConnectionState()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            guilds = build(payload, args.guilds, state)
+            gc.collect()
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        print('{0:<6} {1} guilds: {2:.1f} MiB, {3} unique users, {4:.1f} bytes per member'.format(
+            scale, len(guilds), used / 2**20, len(state._users),
+            used / (members * len(guilds))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Member iteration heavy handlers over views and over copied lists.
+
+Every event of the simulated handler counts the online members, checks
+the author's membership, reads ``TextChannel.members`` and lists a
+category's channels. The list variant takes a snapshot on each access,
+which is what ``Guild.members`` and ``Guild.channels`` used to return,
+and the peak column shows what those copies cost.
+
+Usage::
+
+    python benchmarks/bench_views.py --scales 10k,100k --events 20
+"""
+# discord.py-test
+import common
+from discord_test.guild import Guild
+
+
+def run_scale(scale, sizes, args):
+    members, roles, channels = sizes
+    guild = Guild(data=common.guild_payload(members, roles, channels, seed=args.seed))
+    member_list = guild.members.snapshot()
+    authors = member_list[::max(1, len(member_list) // args.events)][:args.events]
+    text_channel = guild.text_channels[0]
+    category = guild.categories[0]
+
+    def handler(members_of, channels_of):
+        def run(_):
+            for author in authors:
+                sum(1 for m in members_of() if m.status.value != 'offline')
+                author in members_of()
+                [m for m in members_of() if text_channel.permissions_for(m).read_messages]
+                [c for c in channels_of() if c.category_id == category.id]
+        return run
+
+    results = []
+    for name, func in (
+            ('handler, copied lists',
+             handler(lambda: guild.members.snapshot(), lambda: guild.channels.snapshot())),
+            ('handler, views', handler(lambda: guild.members, lambda: guild.channels))):
+        results.append(common.measure(name, scale, func, repeat=args.repeat))
+        print(results[-1])
+    return results
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0], scales=True)
+    p.add_argument('--events', type=int, default=20)
+    args = p.parse_args()
+    print(common.HEADER)
+    results = []
+    for scale, sizes in common.scales(args):
+        results.extend(run_scale(scale, sizes, args))
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
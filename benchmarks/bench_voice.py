@@ -0,0 +1,99 @@
+"""Voice state churn: mute/deaf toggles and channel hops.
+
+Fails with a non-zero exit status below ``--target`` updates per second,
+or when joining voice and muting don't come out as expected.
+
+Usage::
+
+    python benchmarks/bench_voice.py --updates 100000
+"""
+# Stdlib
+import random
+import sys
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+
+
+def check(payload):
+    """Joins a member to voice and mutes them, returns what went wrong."""
+    guild = Guild(data=common.fresh(payload))
+    user_id = next(m.id for m in guild.members if guild._voice_state_for(m.id) is None)
+    data = dict(payload['voice_states'][0], user_id=str(user_id), self_mute=False)
+    channel_id = guild.voice_channels[0].id
+
+    _, before, after = guild._update_voice_state(data, channel_id)
+    if before.channel is not None or after.channel is None:
+        return 'joining voice: before {0!r}, after {1!r}'.format(before, after)
+
+    _, before, after = guild._update_voice_state(dict(data, self_mute=True), channel_id)
+    if before.changed_fields != ('self_mute', ) or not after.self_mute:
+        return 'muting: changed {0}, after {1!r}'.format(before.changed_fields, after)
+    return None
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--updates', type=int, default=100000)
+    p.add_argument('--target', type=float, default=10000, help='updates per second')
+    args = p.parse_args()
+
+    payload = common.guild_payload(10000, 50, 100, seed=args.seed)
+    error = check(payload)
+    if error is not None:
+        print('voice state updates are broken,', error)
+        return 1
+
+    guild = Guild(data=common.fresh(payload))
+    rng = random.Random(args.seed)
+    voice_ids = [c.id for c in guild.voice_channels]
+    states = {int(s['user_id']): dict(s) for s in payload['voice_states']}
+    user_ids = list(states)
+
+    updates = []
+    for _ in range(args.updates):
+        user_id = rng.choice(user_ids)
+        data = dict(states[user_id])
+        roll = rng.random()
+        if roll < 0.4:
+            data['self_mute'] = not data['self_mute']
+        elif roll < 0.7:
+            data['self_deaf'] = not data['self_deaf']
+        elif roll < 0.95:
+            data['channel_id'] = rng.choice(voice_ids)
+        else:
+            # leave, the next update for this user joins again
+            data['channel_id'] = None
+        states[user_id] = dict(data, channel_id=data['channel_id'] or rng.choice(voice_ids))
+        updates.append((data, data['channel_id']))
+
+    def churn(_):
+        update = guild._update_voice_state
+        for data, channel_id in updates:
+            update(data, channel_id)
+
+    def churn_and_read(_):
+        update = guild._update_voice_state
+        for data, channel_id in updates:
+            member, before, after = update(data, channel_id)
+            # what a typical on_voice_state_update listener looks at
+            before.channel is not after.channel or before.self_mute
+
+    print(common.HEADER)
+    results = [
+        common.measure('Guild._update_voice_state', '10k', churn, repeat=args.repeat),
+        common.measure('... and read before/after', '10k', churn_and_read,
+                       repeat=args.repeat)
+    ]
+    failed = False
+    for result in results:
+        rate = args.updates / min(result.times)
+        failed = failed or rate < args.target
+        print(result, '{0:.0f} updates/s'.format(rate))
+    common.report(results, args)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Webhook send capture throughput and assertion query cost.
+
+Usage::
+
+    python benchmarks/bench_webhooks.py --sends 100000
+"""
+# Stdlib
+import asyncio
+
+# External Libraries
+import discord
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+
+
+def main():
+    p = common.parser(__doc__.splitlines()[0])
+    p.add_argument('--sends', type=int, default=100000, help='messages per run')
+    args = p.parse_args()
+
+    guild = Guild(data=common.guild_payload(10, 5, 5, seed=args.seed))
+    state = guild._state
+    loop = asyncio.get_event_loop()
+    webhook = loop.run_until_complete(
+        guild.text_channels[0].create_webhook(name='logger'))
+    embed = discord.Embed(title='log').add_field(name='level', value='info')
+
+    @asyncio.coroutine
+    def send(_):
+        for index in range(args.sends):
+            yield from webhook.send('line %d' % (index % 1000), embed=embed)
+
+    def query(_):
+        capture = state.webhooks.capture
+        for index in range(1000):
+            capture.count(content='line %d' % index)
+        capture.count(field=('level', 'info'))
+
+    print(common.HEADER)
+    results = [
+        common.measure('Webhook.send (%d sends)' % args.sends, 'capture',
+                       lambda _: loop.run_until_complete(send(_)), repeat=args.repeat),
+        common.measure('WebhookCapture.count (1001 queries)', 'capture', query,
+                       repeat=args.repeat)
+    ]
+    for result in results:
+        print(result)
+    print(state.webhooks.metrics())
+    common.report(results, args)
+
+
+if __name__ == '__main__':
+    main()
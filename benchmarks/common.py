@@ -0,0 +1,246 @@
+"""Shared helpers for the benchmark scripts.
+
+Every script builds its fixtures from a fixed seed and never touches the
+network, so numbers from two commits can be compared directly.
+"""
+# Stdlib
+import argparse
+import copy
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+# benchmark the working tree rather than whatever happens to be installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (members, roles, channels)
+SCALES = {
+    '1k': (1000, 50, 50),
+    '10k': (10000, 200, 200),
+    '100k': (100000, 500, 500),
+}
+
+SEED = 1420070400
+
+# 2018-01-01, keeps generated snowflakes stable between runs
+BASE_MILLIS = 1514764800000 - 1420070400000
+
+TEXT, VOICE, CATEGORY = 0, 2, 4
+
+
+class Snowflakes:
+    def __init__(self, millis=BASE_MILLIS):
+        self.millis = millis
+        self.increment = 0
+
+    def __call__(self):
+        self.increment += 1
+        if self.increment >= 4096:
+            self.increment = 0
+            self.millis += 1
+        return (self.millis << 22) | self.increment
+
+
+def guild_payload(members, roles, channels, *, seed=SEED, millis=BASE_MILLIS):
+    rng = random.Random(seed)
+    snowflake = Snowflakes(millis)
+    guild_id = snowflake()
+
+    role_data = [{
+        'id': guild_id,
+        'name': '@everyone',
+        'position': 0,
+        'permissions': 104324161,
+        'color': 0
+    }]
+    for position in range(1, roles):
+        role_data.append({
+            'id': snowflake(),
+            'name': 'role-%d' % position,
+            'position': position,
+            'permissions': rng.getrandbits(31) if rng.random() < 0.1 else 0,
+            'color': rng.getrandbits(24) if rng.random() < 0.5 else 0,
+            'hoist': rng.random() < 0.1,
+            'mentionable': rng.random() < 0.3
+        })
+    role_ids = [r['id'] for r in role_data[1:]]
+
+    category_ids = []
+    channel_data = []
+    for position in range(channels):
+        roll = rng.random()
+        if roll < 0.1 or not category_ids:
+            kind = CATEGORY
+        elif roll < 0.7:
+            kind = TEXT
+        else:
+            kind = VOICE
+
+        overwrites = [{
+            'id': rng.choice(role_ids),
+            'type': 'role',
+            'allow': rng.getrandbits(20),
+            'deny': rng.getrandbits(20)
+        } for _ in range(rng.randrange(3))] if role_ids else []
+
+        data = {
+            'id': snowflake(),
+            'type': kind,
+            'name': 'channel-%d' % position,
+            'position': position,
+            'permission_overwrites': overwrites
+        }
+        if kind == CATEGORY:
+            category_ids.append(data['id'])
+        else:
+            data['parent_id'] = rng.choice(category_ids)
+        if kind == VOICE:
+            data['bitrate'] = 64000
+            data['user_limit'] = 0
+        channel_data.append(data)
+    voice_ids = [c['id'] for c in channel_data if c['type'] == VOICE]
+
+    member_data = []
+    presences = []
+    voice_states = []
+    for index in range(members):
+        user = {
+            'id': snowflake(),
+            'username': 'user%d' % rng.randrange(members),
+            'discriminator': '%04d' % rng.randrange(1, 10000),
+            'avatar': None,
+            'bot': rng.random() < 0.01
+        }
+        member_data.append({
+            'user': user,
+            'roles': rng.sample(role_ids, min(len(role_ids), rng.randrange(6))),
+            'nick': 'nick%d' % index if rng.random() < 0.2 else None,
+            'joined_at': '2018-01-01T00:00:00.000000+00:00'
+        })
+        presences.append({
+            'user': {'id': user['id']},
+            'status': rng.choice(('online', 'idle', 'dnd', 'offline')),
+            'game': {'name': 'game %d' % rng.randrange(50)} if rng.random() < 0.2 else None
+        })
+        if voice_ids and rng.random() < 0.05:
+            voice_states.append({
+                'user_id': user['id'],
+                'channel_id': rng.choice(voice_ids),
+                'session_id': '%032x' % rng.getrandbits(128),
+                'deaf': False,
+                'mute': False,
+                'self_deaf': False,
+                'self_mute': rng.random() < 0.3,
+                'suppress': False
+            })
+
+    return {
+        'id': guild_id,
+        'name': 'benchmark guild',
+        'region': 'us-east',
+        'owner_id': member_data[0]['user']['id'] if member_data else None,
+        'member_count': members,
+        'large': members >= 250,
+        'roles': role_data,
+        'channels': channel_data,
+        'members': member_data,
+        'presences': presences,
+        'voice_states': voice_states
+    }
+
+
+def drive(coro):
+    # the fakes never suspend, one step runs a call to completion
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+
+
+def fresh(payload):
+    # every run gets its own copy, so no run sees state left by another
+    return copy.deepcopy(payload)
+
+
+class Result:
+    __slots__ = ('name', 'scale', 'times', 'peak')
+
+    def __init__(self, name, scale, times, peak):
+        self.name = name
+        self.scale = scale
+        self.times = times
+        self.peak = peak
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'scale': self.scale,
+            'best': min(self.times),
+            'median': statistics.median(self.times),
+            'peak_bytes': self.peak
+        }
+
+    def __str__(self):
+        return '{0:<10} {1:<40} {2:>12.3f} {3:>12.3f} {4:>12.1f}'.format(
+            self.scale, self.name, min(self.times) * 1e3,
+            statistics.median(self.times) * 1e3, self.peak / 1024)
+
+
+HEADER = '{0:<10} {1:<40} {2:>12} {3:>12} {4:>12}'.format(
+    'scale', 'benchmark', 'best (ms)', 'median (ms)', 'peak (KiB)')
+
+
+def measure(name, scale, func, setup=None, *, repeat=5):
+    """Times ``func(setup())`` and records its peak traced memory.
+
+    The timed runs happen without tracemalloc, which would skew them, and
+    one extra run is made under tracemalloc for the memory figure.
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+
+    arg = setup() if setup is not None else None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return Result(name, scale, times, peak)
+
+
+def parser(description, *, scales=False):
+    """The shared options, with ``--scales`` only for scripts that run them."""
+    p = argparse.ArgumentParser(description=description)
+    if scales:
+        p.add_argument(
+            '--scales',
+            default=','.join(SCALES),
+            help='comma separated scales to run, out of %s' % ', '.join(SCALES))
+    p.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark')
+    p.add_argument('--seed', type=int, default=SEED, help='fixture seed')
+    p.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    return p
+
+
+def scales(args):
+    for scale in args.scales.split(','):
+        yield scale, SCALES[scale]
+
+
+def report(results, args):
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([r.to_dict() for r in results], f, indent=2)
@@ -0,0 +1,116 @@
+"""Memory budget check for the fake objects.
+
+Fails with a non-zero exit status when a fake grows a ``__dict__``, an
+instance outgrows its size budget or a guild costs more per member than
+``MEMBER_BUDGET``, so 100k member guilds keep fitting into every worker.
+
+Usage::
+
+    python benchmarks/memory_budget.py --scales 10k
+"""
+# Stdlib
+import gc
+import sys
+import tracemalloc
+
+# discord.py-test
+import common
+from discord_test.guild import Guild
+from discord_test.message import Message, Attachment
+
+# sys.getsizeof of a bare instance, in bytes
+OBJECT_BUDGETS = {
+    'Guild': 320,
+    'Member': 128,
+    'VoiceState': 128,
+    'TextChannel': 128,
+    'VoiceChannel': 128,
+    'CategoryChannel': 128,
+    'Message': 320,
+    'Attachment': 128,
+}
+
+# traced bytes per member of a whole guild, including its user and roles
+MEMBER_BUDGET = 2048
+
+
+def sample_objects(guild):
+    channel = guild.text_channels[0]
+    objects = [
+        guild,
+        next(iter(guild._members.values())),
+        channel,
+        guild.voice_channels[0],
+        guild.categories[0],
+        Message(
+            channel=channel,
+            data={
+                'id': common.Snowflakes()(),
+                'type': 0,
+                'content': 'hello',
+                'edited_timestamp': None
+            }),
+        Attachment(
+            data={
+                'id': common.Snowflakes()(),
+                'size': 1024,
+                'filename': 'file.txt'
+            })
+    ]
+    objects.extend(list(guild._voice_states.values())[:1])
+    return objects
+
+
+def check_objects(guild):
+    failures = []
+    for obj in sample_objects(guild):
+        name = type(obj).__name__
+        size = sys.getsizeof(obj)
+        if hasattr(obj, '__dict__'):
+            failures.append('{0} instances have a __dict__'.format(name))
+        if size > OBJECT_BUDGETS[name]:
+            failures.append('{0} is {1} bytes, budget is {2}'.format(
+                name, size, OBJECT_BUDGETS[name]))
+        print('{0:<16} {1:>6} bytes (budget {2})'.format(
+            name, size, OBJECT_BUDGETS[name]))
+    return failures
+
+
+def check_guild(scale, sizes, seed):
+    members, roles, channels = sizes
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # the payload is built under tracing too so that the strings the
+        # guild keeps from it are counted once the payload is gone
+        payload = common.guild_payload(members, roles, channels, seed=seed)
+        guild = Guild(data=payload)
+        del payload
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    per_member = used / members
+    print('{0:<16} {1:>9.1f} bytes per member (budget {2})'.format(
+        scale, per_member, MEMBER_BUDGET))
+    failures = check_objects(guild)
+    if per_member > MEMBER_BUDGET:
+        failures.append('{0} guild costs {1:.1f} bytes per member, budget is {2}'.format(
+            scale, per_member, MEMBER_BUDGET))
+    return failures
+
+
+def main():
+    args = common.parser(__doc__.splitlines()[0], scales=True).parse_args()
+    failures = []
+    for scale, sizes in common.scales(args):
+        failures.extend(check_guild(scale, sizes, args.seed))
+
+    for failure in failures:
+        print('FAIL:', failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
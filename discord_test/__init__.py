@@ -0,0 +1,83 @@
+"""Fakes of the discord.py models, to test bots without connecting them.
+
+The public names are resolved on first access, so importing one fake only
+loads the modules it depends on, and importing the package alone does not
+load discord.py at all.
+"""
+# Stdlib
+import importlib
+import sys
+
+# discord.py-test
+from discord_test.misc import __version__  # noqa: F401, re-exported through __all__
+
+# (name, module) in dependency order, which the eager fallback relies on
+_EXPORTS = (
+    # used as is from discord.py
+    ('AuditLogIterator', 'discord.iterators'),
+    ('CallMessage', 'discord'),
+    ('Colour', 'discord'),
+    ('Embed', 'discord'),
+    ('Game', 'discord'),
+    ('Status', 'discord'),
+    # the fakes
+    ('ModelView', 'discord_test.views'),
+    ('Messageable', 'discord_test.abc'),
+    ('GuildChannel', 'discord_test.abc'),
+    ('TraceRecorder', 'discord_test.trace'),
+    ('ReactionStore', 'discord_test.reaction'),
+    ('CDN', 'discord_test.cdn'),
+    ('BanEntry', 'discord_test.moderation'),
+    ('BanStore', 'discord_test.moderation'),
+    ('Invite', 'discord_test.moderation'),
+    ('InviteStore', 'discord_test.moderation'),
+    ('User', 'discord_test.user'),
+    ('VOICE_STATE_FIELDS', 'discord_test.member'),
+    ('VoiceState', 'discord_test.member'),
+    ('VoiceStateSnapshot', 'discord_test.member'),
+    ('Member', 'discord_test.member'),
+    ('TextChannel', 'discord_test.channel'),
+    ('VoiceChannel', 'discord_test.channel'),
+    ('CategoryChannel', 'discord_test.channel'),
+    ('DMChannel', 'discord_test.channel'),
+    ('GroupChannel', 'discord_test.channel'),
+    ('Attachment', 'discord_test.message'),
+    ('Message', 'discord_test.message'),
+    ('Outbox', 'discord_test.outbox'),
+    ('Webhook', 'discord_test.webhook'),
+    ('WebhookStore', 'discord_test.webhook'),
+    ('ConnectionState', 'discord_test.state'),
+    ('Guild', 'discord_test.guild'),
+    ('Context', 'discord_test.context'),
+    ('MemberChunker', 'discord_test.chunker'),
+    ('MessageIndex', 'discord_test.search'),
+    ('ShardCluster', 'discord_test.shard'),
+    ('GuildGenerator', 'discord_test.generator'),
+)
+
+_LAZY = dict(_EXPORTS)
+
+__all__ = ['__version__'] + [name for name, _ in _EXPORTS]
+
+
+def _load(name):
+    value = getattr(importlib.import_module(_LAZY[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+            __name__, name))
+    return _load(name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__ before PEP 562, resolve everything up front
+    for _name, _ in _EXPORTS:
+        _load(_name)
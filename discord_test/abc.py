@@ -0,0 +1,165 @@
+# Stdlib
+import asyncio
+
+# External Libraries
+import discord
+
+# discord.py-test
+from discord_test import trace
+
+
+def _flags(*names):
+    permissions = discord.Permissions.none()
+    for name in names:
+        setattr(permissions, name, True)
+    return permissions.value
+
+
+_READ_MESSAGES = _flags('read_messages')
+_SEND_MESSAGES = _flags('send_messages')
+# implied away when a member can't send messages
+_SEND_DEPENDENT = _flags('send_tts_messages', 'mention_everyone', 'embed_links',
+                         'attach_files')
+_ALL_CHANNEL = discord.Permissions.all_channel().value
+
+
+def _files(file, files):
+    """Checks the ``file`` and ``files`` of a send, returns the files as a list."""
+    if file is not None and files is not None:
+        raise discord.InvalidArgument('cannot pass both file and files parameter to send()')
+    if file is not None:
+        return [file]
+    if files is not None and len(files) > 10:
+        raise discord.InvalidArgument('files parameter must be a list of up to 10 elements')
+    return list(files or ())
+
+
+class Messageable:
+    # mixed in ahead of the discord.py classes, must not add any slots
+    __slots__ = ()
+
+    @asyncio.coroutine
+    def send(self,
+             content=None,
+             *,
+             tts=False,
+             embed=None,
+             file=None,
+             files=None,
+             delete_after=None,
+             nonce=None):
+        # delete_after is accepted for compatibility, messages can't be
+        # deleted in the fakes yet
+        files = _files(file, files)
+        channel = yield from self._get_channel()
+        return channel._state.outbox.send(
+            channel, content, tts=tts, embed=embed, files=files, nonce=nonce)
+
+
+class GuildChannel:
+    """Overwrite resolution for the guild channel fakes.
+
+    ``_fill_overwrites`` precomputes the @everyone overwrite, a role id to
+    ``(allow, deny)`` map and the member overwrites, so ``permissions_for``
+    is a handful of dict lookups instead of a scan of ``_overwrites``.
+    The payload is left untouched, unlike discord.py which pops the ids.
+
+    The concrete classes declare the ``_everyone_overwrite``,
+    ``_role_overwrites`` and ``_member_overwrites`` slots, and in
+    ``_SYNC_FIELDS`` the ``(key, attribute, default, convert)`` of the
+    payload fields :meth:`_diff` compares.
+    """
+    __slots__ = ()
+
+    _SYNC_FIELDS = ()
+
+    def _diff(self, data):
+        """Returns the names of the attributes ``_update(data)`` would change."""
+        changed = []
+        for key, attr, default, convert in self._SYNC_FIELDS:
+            value = data.get(key, default)
+            if convert is not None and value is not None:
+                value = convert(value)
+            if getattr(self, attr) != value:
+                changed.append(attr)
+
+        incoming = {(int(o['id']), o['type'], o['allow'], o['deny'])
+                    for o in data.get('permission_overwrites', ())}
+        if incoming != {(o.id, o.type, o.allow, o.deny) for o in self._overwrites}:
+            changed.append('overwrites')
+        return changed
+
+    def _fill_overwrites(self, data):
+        everyone_id = self.guild.id
+        overwrites = []
+        everyone = None
+        roles = {}
+        members = {}
+
+        for overwrite in data.get('permission_overwrites', ()):
+            overwrite_id = int(overwrite['id'])
+            kind = overwrite['type']
+            pair = (overwrite['allow'], overwrite['deny'])
+            entry = discord.abc._Overwrites(
+                id=overwrite_id, allow=pair[0], deny=pair[1], type=kind)
+
+            if kind == 'member':
+                members[overwrite_id] = pair
+            elif overwrite_id == everyone_id:
+                # discord.py expects the @everyone overwrite to come first
+                everyone = pair
+                overwrites.insert(0, entry)
+                continue
+            else:
+                roles[overwrite_id] = pair
+            overwrites.append(entry)
+
+        self._overwrites = overwrites
+        self._everyone_overwrite = everyone
+        self._role_overwrites = roles
+        self._member_overwrites = members
+
+    def permissions_for(self, member):
+        # owner and administrator come back as Permissions.all(),
+        # which bypasses every overwrite
+        base = member.guild_permissions
+        if base.administrator:
+            return base
+        value = base.value
+
+        everyone = self._everyone_overwrite
+        if everyone is not None:
+            value = (value & ~everyone[1]) | everyone[0]
+
+        roles = self._role_overwrites
+        if roles:
+            allow = deny = 0
+            for role in member.roles:
+                pair = roles.get(role.id)
+                if pair is not None:
+                    allow |= pair[0]
+                    deny |= pair[1]
+            value = (value & ~deny) | allow
+
+        pair = self._member_overwrites.get(member.id)
+        if pair is not None:
+            value = (value & ~pair[1]) | pair[0]
+
+        if not value & _SEND_MESSAGES:
+            value &= ~_SEND_DEPENDENT
+
+        if not value & _READ_MESSAGES:
+            value &= ~_ALL_CHANNEL
+
+        return discord.Permissions(value)
+
+    permissions_for.__doc__ = discord.abc.GuildChannel.permissions_for.__doc__
+
+    @trace.traced
+    @asyncio.coroutine
+    def create_invite(self, *, reason=None, **fields):
+        return self.guild.invite_store.create(self, inviter=self._state.user, **fields)
+
+    @asyncio.coroutine
+    def invites(self):
+        return self.guild.invite_store.for_channel(self.id)
@@ -0,0 +1,133 @@
+# Stdlib
+import asyncio
+import collections
+import mmap
+
+# External Libraries
+import discord
+
+_Response = collections.namedtuple('_Response', 'status reason')
+
+try:
+    StopAsyncIteration = StopAsyncIteration
+except NameError:
+    # Python 3.4 has no async for, but flatten() and manual __anext__()
+    # loops still need the end of the stream to be an exception of its own
+    class StopAsyncIteration(Exception):
+        pass
+
+
+class _ChunkIterator:
+    def __init__(self, view, chunk_size):
+        self.view = view
+        self.chunk_size = chunk_size
+        self.offset = 0
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        offset = self.offset
+        if offset >= len(self.view):
+            raise StopAsyncIteration
+
+        self.offset = offset + self.chunk_size
+        # give other tasks a chance to run between chunks
+        yield from asyncio.sleep(0)
+        return self.view[offset:self.offset]
+
+
+class CDN:
+    """Local blob store answering for fake CDN urls.
+
+    Blobs are registered per url, either from memory or from a file that
+    gets memory-mapped, and are handed out as read-only memoryviews so
+    that saving or streaming them never copies the data. Every caller gets
+    its own view, which stays readable after the blob is replaced or
+    removed. Anything with a url works, attachments as well as guild
+    icons and splashes.
+    """
+
+    def __init__(self):
+        self._blobs = {}
+        self._maps = {}
+
+    def __contains__(self, url):
+        return url in self._blobs
+
+    def __len__(self):
+        return len(self._blobs)
+
+    def put(self, url, data):
+        self.remove(url)
+        self._blobs[url] = memoryview(data).cast('B')
+
+    def put_file(self, url, path):
+        self.remove(url)
+        with open(path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files can't be mapped
+                self._blobs[url] = memoryview(b'')
+                return
+
+        self._maps[url] = mapped
+        self._blobs[url] = memoryview(mapped)
+
+    def put_attachment(self, channel_id, attachment_id, file):
+        """Stores a :class:`discord.File` sent to a channel, returns its attachment payload.
+
+        The file is read and closed, like discord.py does after uploading it.
+        """
+        try:
+            blob = file.fp.read()
+        finally:
+            file.fp.close()
+        url = 'https://cdn.discordapp.com/attachments/{0}/{1}/{2}'.format(
+            channel_id, attachment_id, file.filename)
+        self.put(url, blob)
+        return {
+            'id': attachment_id,
+            'filename': file.filename,
+            'size': len(blob),
+            'url': url,
+            'proxy_url': url
+        }
+
+    def remove(self, url):
+        # only the store's own view is released, callers hold slices of it
+        view = self._blobs.pop(url, None)
+        if view is not None:
+            view.release()
+
+        mapped = self._maps.pop(url, None)
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                # a caller still holds a view, the map goes away with it
+                pass
+
+    def close(self):
+        for url in list(self._blobs):
+            self.remove(url)
+
+    def get(self, url):
+        try:
+            return self._blobs[url][:]
+        except KeyError:
+            raise discord.NotFound(
+                _Response(404, 'Not Found'),
+                'no blob registered for {0}'.format(url)) from None
+
+    @asyncio.coroutine
+    def get_attachment(self, url):
+        return self.get(url)
+
+    get_from_cdn = get_attachment
+
+    def iter_chunks(self, url, chunk_size=1 << 16):
+        """Asynchronously iterates over memoryview slices of a blob."""
+        return _ChunkIterator(self.get(url), chunk_size)
@@ -1,12 +1,29 @@
 # Stdlib
 import asyncio
+import hashlib
 
 # External Libraries
 import discord
 
+# discord.py-test
+from discord_test import stats, trace
+from discord_test import Messageable, GuildChannel
 
-class TextChannel(discord.TextChannel):
-    def __init__(self, *, guild, data):
+_VOICE = discord.Permissions.voice().value
+
+
+@stats.instrumented('permissions_for', '_update')
+class TextChannel(Messageable, GuildChannel, discord.TextChannel):
+    __slots__ = ('_everyone_overwrite', '_role_overwrites', '_member_overwrites')
+
+    _SYNC_FIELDS = (('name', 'name', None, None),
+                    ('parent_id', 'category_id', None, int),
+                    ('topic', 'topic', None, None),
+                    ('position', 'position', None, None),
+                    ('nsfw', 'nsfw', False, None))
+
+    def __init__(self, *, guild, data, state=None):
+        self._state = state if state is not None else guild._state
         self.id = int(data['id'])
         self._update(guild, data)
 
@@ -35,8 +52,7 @@ class TextChannel(discord.TextChannel):
         base = super().permissions_for(member)
 
         # text channels do not have voice related permissions
-        denied = discord.Permissions.voice()
-        base.value &= ~denied.value
+        base.value &= ~_VOICE
         return base
 
     permissions_for.__doc__ = discord.abc.GuildChannel.permissions_for.__doc__
@@ -52,14 +68,17 @@ class TextChannel(discord.TextChannel):
         n = self.name
         return self.nsfw or n == 'nsfw' or n[:5] == 'nsfw-'
 
+    @trace.traced
     @asyncio.coroutine
     def edit(self, *, reason=None, **options):
         yield from self._edit(options, reason=reason)
 
+    @trace.traced
     @asyncio.coroutine
     def delete_messages(self, messages):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def purge(self,
               *,
@@ -74,15 +93,26 @@ class TextChannel(discord.TextChannel):
 
     @asyncio.coroutine
     def webhooks(self):
-        raise NotImplementedError
+        return self._state.webhooks.for_channel(self.id)
 
+    @trace.traced
     @asyncio.coroutine
     def create_webhook(self, *, name=None, avatar=None):
-        raise NotImplementedError
+        return self._state.webhooks.create(self, name=name, avatar=avatar)
+
+
+@stats.instrumented('permissions_for', '_update')
+class VoiceChannel(GuildChannel, discord.VoiceChannel):
+    __slots__ = ('_everyone_overwrite', '_role_overwrites', '_member_overwrites')
 
+    _SYNC_FIELDS = (('name', 'name', None, None),
+                    ('parent_id', 'category_id', None, int),
+                    ('position', 'position', None, None),
+                    ('bitrate', 'bitrate', None, None),
+                    ('user_limit', 'user_limit', None, None))
 
-class VoiceChannel(discord.VoiceChannel):
-    def __init__(self, *, guild, data):
+    def __init__(self, *, guild, data, state=None):
+        self._state = state if state is not None else guild._state
         self.id = int(data['id'])
         self._update(guild, data)
 
@@ -119,13 +149,23 @@ class VoiceChannel(discord.VoiceChannel):
                     ret.append(member)
         return ret
 
+    @trace.traced
     @asyncio.coroutine
     def edit(self, *, reason=None, **options):
         yield from self._edit(options, reason=reason)
 
 
-class CategoryChannel(discord.CategoryChannel):
-    def __init__(self, *, guild, data):
+@stats.instrumented('permissions_for', '_update')
+class CategoryChannel(GuildChannel, discord.CategoryChannel):
+    __slots__ = ('_everyone_overwrite', '_role_overwrites', '_member_overwrites')
+
+    _SYNC_FIELDS = (('name', 'name', None, None),
+                    ('parent_id', 'category_id', None, int),
+                    ('nsfw', 'nsfw', False, None),
+                    ('position', 'position', None, None))
+
+    def __init__(self, *, guild, data, state=None):
+        self._state = state if state is not None else guild._state
         self.id = int(data['id'])
         self._update(guild, data)
 
@@ -145,6 +185,7 @@ class CategoryChannel(discord.CategoryChannel):
         n = self.name
         return self.nsfw or n == 'nsfw' or n[:5] == 'nsfw-'
 
+    @trace.traced
     @asyncio.coroutine
     def edit(self, *, reason=None, **options):
         raise NotImplementedError
@@ -159,9 +200,12 @@ class CategoryChannel(discord.CategoryChannel):
         return ret
 
 
-class DMChannel(discord.DMChannel):
-    def __init__(self, *, me, data):
-        # self.recipient = state.store_user(data['recipients'][0])
+class DMChannel(Messageable, discord.DMChannel):
+    __slots__ = ()
+
+    def __init__(self, *, me, data, state=None):
+        self._state = state
+        self.recipient = state.store_user(data['recipients'][0])
         self.me = me
         self.id = int(data['id'])
 
@@ -186,14 +230,32 @@ class DMChannel(discord.DMChannel):
         return base
 
 
-class GroupChannel(discord.GroupChannel):
-    def __init__(self, *, me, data):
+class GroupChannel(Messageable, discord.GroupChannel):
+    __slots__ = ()
+
+    def __init__(self, *, me, data, state=None):
+        self._state = state
         self.id = int(data['id'])
         self.me = me
         self._update_group(data)
 
     def _update_group(self, data):
-        raise NotImplementedError
+        owner_id = discord.utils._get_as_snowflake(data, 'owner_id')
+        self.icon = data.get('icon')
+        self.name = data.get('name')
+
+        try:
+            self.recipients = [
+                self._state.store_user(u) for u in data['recipients']
+            ]
+        except KeyError:
+            pass
+
+        if self.me is not None and owner_id == self.me.id:
+            self.owner = self.me
+        else:
+            self.owner = discord.utils.find(lambda u: u.id == owner_id,
+                                            self.recipients)
 
     @asyncio.coroutine
     def _get_channel(self):
@@ -234,18 +296,44 @@ class GroupChannel(discord.GroupChannel):
 
         return base
 
+    def _add_recipients(self, recipients):
+        present = {u.id for u in self.recipients}
+        for recipient in recipients:
+            if recipient.id not in present:
+                present.add(recipient.id)
+                # the stored user, not a member wrapping it
+                self.recipients.append(getattr(recipient, '_user', recipient))
+
+    def _remove_recipients(self, recipients):
+        removed = {u.id for u in recipients}
+        self.recipients = [u for u in self.recipients if u.id not in removed]
+
+    @trace.traced
     @asyncio.coroutine
     def add_recipients(self, *recipients):
-        raise NotImplementedError
+        self._add_recipients(recipients)
 
+    @trace.traced
     @asyncio.coroutine
     def remove_recipients(self, *recipients):
-        raise NotImplementedError
+        self._remove_recipients(recipients)
 
+    @trace.traced
     @asyncio.coroutine
     def edit(self, **fields):
-        raise NotImplementedError
-
+        try:
+            icon = fields['icon']
+        except KeyError:
+            pass
+        else:
+            self.icon = hashlib.md5(icon).hexdigest() if icon is not None else None
+
+        try:
+            self.name = fields['name']
+        except KeyError:
+            pass
+
+    @trace.traced
     @asyncio.coroutine
     def leave(self):
-        raise NotImplementedError
+        self._state._remove_private_channel(self)
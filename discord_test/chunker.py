@@ -0,0 +1,114 @@
+# Stdlib
+import asyncio
+import bisect
+import collections
+
+# discord.py-test
+from discord_test import Member
+from discord_test.cdn import StopAsyncIteration
+
+
+class _ChunkStream:
+    def __init__(self, chunker, user_ids):
+        self.chunker = chunker
+        self.user_ids = iter(user_ids)
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        chunker = self.chunker
+        ids = [uid for _, uid in zip(range(chunker.chunk_size), self.user_ids)]
+        if not ids:
+            raise StopAsyncIteration
+
+        # pacing, and a chance for the bot to run between chunks
+        yield from asyncio.sleep(chunker.delay)
+        return chunker._deliver(ids)
+
+    @asyncio.coroutine
+    def flatten(self):
+        ret = []
+        while True:
+            try:
+                chunk = yield from self.__anext__()
+            except StopAsyncIteration:
+                return ret
+            ret.extend(chunk)
+
+
+class MemberChunker:
+    """Simulated REQUEST_GUILD_MEMBERS flow for a fake guild.
+
+    The chunker plays the gateway: it holds every member payload of the
+    guild and streams them into the guild's member cache in chunks of
+    ``chunk_size``, sleeping ``delay`` seconds between chunks. Members can
+    also be requested by username prefix, served from a sorted name
+    index, or by user id.
+    """
+
+    def __init__(self, guild, members, *, chunk_size=1000, delay=0.0):
+        self.guild = guild
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self._payloads = collections.OrderedDict(
+            (int(m['user']['id']), m) for m in members)
+
+        index = sorted((m['user']['username'].lower(), user_id)
+                       for user_id, m in self._payloads.items())
+        self._names = [name for name, _ in index]
+        self._name_ids = [user_id for _, user_id in index]
+
+        count = len(set(self._payloads).union(guild._members))
+        guild._member_count = max(getattr(guild, '_member_count', 0) or 0, count)
+
+    def __len__(self):
+        return len(self._payloads)
+
+    @property
+    def pending(self):
+        """How many members have not been delivered to the guild yet."""
+        members = self.guild._members
+        return sum(1 for user_id in self._payloads if user_id not in members)
+
+    def _deliver(self, user_ids):
+        guild = self.guild
+        state = guild._state
+        chunk = []
+        for user_id in user_ids:
+            member = guild._members.get(user_id)
+            if member is None:
+                member = Member(
+                    data=self._payloads[user_id], guild=guild, state=state)
+                guild._add_member(member)
+            chunk.append(member)
+        return chunk
+
+    def chunks(self):
+        """Streams every member missing from the guild, chunk by chunk."""
+        members = self.guild._members
+        return _ChunkStream(
+            self, [uid for uid in self._payloads if uid not in members])
+
+    def query(self, prefix, *, limit=0):
+        """Streams the members whose username starts with ``prefix``.
+
+        An empty prefix with no limit requests every member, like the
+        gateway does.
+        """
+        prefix = prefix.lower()
+        names = self._names
+        start = bisect.bisect_left(names, prefix)
+        end = len(names)
+        if prefix:
+            # every name with the prefix sorts before prefix + the highest char
+            end = bisect.bisect_left(names, prefix + '\U0010ffff', start)
+        if limit:
+            end = min(end, start + limit)
+        return _ChunkStream(self, self._name_ids[start:end])
+
+    def query_ids(self, user_ids):
+        """Streams the requested members, skipping unknown ids."""
+        payloads = self._payloads
+        return _ChunkStream(self, [uid for uid in user_ids if uid in payloads])
@@ -3,9 +3,13 @@ import asyncio
 
 # External Libraries
 import discord
+import discord.ext.commands
 
+# discord.py-test
+from discord_test import Messageable
 
-class Context(discord.ext.commands.Context):
+
+class Context(Messageable, discord.ext.commands.Context):
     def __init__(self, **attrs):
         self.message = attrs.pop('message', None)
         self.bot = attrs.pop('bot', None)
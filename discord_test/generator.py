@@ -0,0 +1,356 @@
+# Stdlib
+import bisect
+import datetime
+import gc
+import itertools
+import math
+import random
+
+# External Libraries
+import discord
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TEXT = discord.ChannelType.text.value
+VOICE = discord.ChannelType.voice.value
+CATEGORY = discord.ChannelType.category.value
+
+DEFAULT_STATUSES = {'online': 0.3, 'idle': 0.1, 'dnd': 0.1, 'offline': 0.5}
+
+
+class _NumpyBackend:
+    def __init__(self, seed):
+        self.rng = numpy.random.RandomState(seed)
+
+    def ints(self, low, high, size):
+        return self.rng.randint(low, high, size=size, dtype=numpy.int64)
+
+    def random(self, size):
+        return self.rng.random_sample(size)
+
+    def poisson(self, lam, size):
+        return self.rng.poisson(lam, size)
+
+    def choice(self, n, size, p):
+        return self.rng.choice(n, size=size, p=p)
+
+    def snowflakes(self, start, span, size):
+        offsets = numpy.sort(self.ints(0, span << 22, size))
+        # make the offsets strictly increasing so every id is unique
+        steps = numpy.arange(size, dtype=numpy.int64)
+        offsets = numpy.maximum.accumulate(offsets - steps) + steps
+        return ((start << 22) + offsets).tolist()
+
+    @staticmethod
+    def tolist(array):
+        return array.tolist()
+
+
+class _PythonBackend:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def ints(self, low, high, size):
+        randrange = self.rng.randrange
+        return [randrange(low, high) for _ in range(size)]
+
+    def random(self, size):
+        r = self.rng.random
+        return [r() for _ in range(size)]
+
+    def poisson(self, lam, size):
+        # Knuth's method, fine for the small means used here
+        limit = math.exp(-lam)
+        r = self.rng.random
+        ret = []
+        for _ in range(size):
+            k, p = 0, r()
+            while p > limit:
+                k += 1
+                p *= r()
+            ret.append(k)
+        return ret
+
+    def choice(self, n, size, p):
+        cumulative = list(itertools.accumulate(p))
+        r = self.rng.random
+        total = cumulative[-1]
+        return [
+            min(n - 1, bisect.bisect_right(cumulative, r() * total))
+            for _ in range(size)
+        ]
+
+    def snowflakes(self, start, span, size):
+        offsets = sorted(self.ints(0, span << 22, size))
+        previous = -1
+        ret = []
+        for offset in offsets:
+            previous = offset if offset > previous else previous + 1
+            ret.append((start << 22) + previous)
+        return ret
+
+    @staticmethod
+    def tolist(values):
+        return list(values)
+
+
+class GuildGenerator:
+    """Seeded generator of realistic guild payloads.
+
+    Snowflakes are time ordered and generated in bulk, with NumPy when it
+    is installed and in pure Python otherwise. A seed gives the same guild
+    every time for a given backend. The output feeds ``Guild(data=...)``
+    and ``Guild._sync`` directly, or can be streamed as gateway payloads
+    with :meth:`stream`.
+
+    Role assignments follow a skewed popularity, so a few roles are very
+    common and most are rare, like in real guilds.
+    """
+
+    def __init__(self,
+                 *,
+                 seed=0,
+                 members=1000,
+                 roles=50,
+                 channels=50,
+                 roles_per_member=2.0,
+                 role_skew=1.2,
+                 category_ratio=0.1,
+                 voice_ratio=0.3,
+                 overwrites_per_channel=1.0,
+                 nick_ratio=0.2,
+                 bot_ratio=0.01,
+                 statuses=None,
+                 game_ratio=0.2,
+                 voice_state_ratio=0.05,
+                 start=datetime.datetime(2017, 1, 1),
+                 days=365,
+                 use_numpy=None):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        if use_numpy and numpy is None:
+            raise RuntimeError('numpy is required for use_numpy=True')
+
+        self.seed = seed
+        self.members = members
+        self.roles = max(1, roles)
+        self.channels = channels
+        self.roles_per_member = roles_per_member
+        self.role_skew = role_skew
+        self.category_ratio = category_ratio
+        self.voice_ratio = voice_ratio
+        self.overwrites_per_channel = overwrites_per_channel
+        self.nick_ratio = nick_ratio
+        self.bot_ratio = bot_ratio
+        self.statuses = statuses or DEFAULT_STATUSES
+        self.game_ratio = game_ratio
+        self.voice_state_ratio = voice_state_ratio
+        self.start = discord.utils.time_snowflake(start) >> 22
+        self.span = days * 86400000
+        self._backend_type = _NumpyBackend if use_numpy else _PythonBackend
+
+    def snowflakes(self, count, backend=None):
+        """Returns ``count`` unique, increasing snowflakes within the time span."""
+        backend = backend or self._backend_type(self.seed)
+        return backend.snowflakes(self.start, self.span, count)
+
+    def _roles(self, backend, guild_id, ids):
+        flags = backend.tolist(backend.random(len(ids) * 2))
+        colours = backend.tolist(backend.ints(0, 1 << 24, len(ids)))
+        ret = [{
+            'id': str(guild_id),
+            'name': '@everyone',
+            'position': 0,
+            'permissions': 104324161,
+            'color': 0,
+            'hoist': False,
+            'mentionable': False,
+            'managed': False
+        }]
+        for index, role_id in enumerate(ids, 1):
+            ret.append({
+                'id': str(role_id),
+                'name': 'role-%d' % index,
+                'position': index,
+                'permissions': 0 if flags[index * 2 - 2] < 0.9 else 8,
+                'color': colours[index - 1] if flags[index * 2 - 1] < 0.5 else 0,
+                'hoist': flags[index * 2 - 1] < 0.1,
+                'mentionable': flags[index * 2 - 2] < 0.3,
+                'managed': False
+            })
+        return ret
+
+    def _channels(self, backend, ids, role_ids):
+        count = len(ids)
+        categories = min(count, max(1, int(count * self.category_ratio)))
+        kinds = backend.tolist(backend.random(count))
+        parents = backend.tolist(backend.ints(0, categories, count))
+        overwrite_counts = backend.tolist(
+            backend.poisson(self.overwrites_per_channel, count))
+        total = sum(overwrite_counts)
+        overwrite_roles = backend.tolist(
+            backend.ints(0, max(1, len(role_ids)), total))
+        masks = backend.tolist(backend.ints(0, 1 << 20, total * 2))
+
+        ret = []
+        cursor = 0
+        for index, channel_id in enumerate(ids):
+            overwrites = []
+            for _ in range(overwrite_counts[index] if role_ids else 0):
+                overwrites.append({
+                    'id': str(role_ids[overwrite_roles[cursor]]),
+                    'type': 'role',
+                    'allow': masks[cursor * 2],
+                    'deny': masks[cursor * 2 + 1] & ~masks[cursor * 2]
+                })
+                cursor += 1
+
+            data = {
+                'id': str(channel_id),
+                'name': 'channel-%d' % index,
+                'position': index,
+                'permission_overwrites': overwrites
+            }
+            if index < categories:
+                data['type'] = CATEGORY
+            else:
+                data['parent_id'] = str(ids[parents[index]])
+                if kinds[index] < self.voice_ratio:
+                    data['type'] = VOICE
+                    data['bitrate'] = 64000
+                    data['user_limit'] = 0
+                else:
+                    data['type'] = TEXT
+                    data['topic'] = None
+                    data['nsfw'] = False
+            ret.append(data)
+        return ret
+
+    def _role_weights(self):
+        weights = [1.0 / (rank**self.role_skew) for rank in range(1, self.roles)]
+        total = sum(weights) or 1.0
+        return [w / total for w in weights]
+
+    def generate(self):
+        """Builds the full GUILD_CREATE payload of the guild."""
+        # the payload is a tree of fresh dicts and lists, so the cyclic
+        # collector only burns time walking it while it is being built
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._generate()
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _generate(self):
+        backend = self._backend_type(self.seed)
+        n = self.members
+        ids = backend.snowflakes(self.start, self.span,
+                                 1 + (self.roles - 1) + self.channels + n)
+        guild_id = ids[0]
+        role_ids = ids[1:self.roles]
+        channel_ids = ids[self.roles:self.roles + self.channels]
+        user_ids = ids[self.roles + self.channels:]
+
+        roles = self._roles(backend, guild_id, role_ids)
+        channels = self._channels(backend, channel_ids, role_ids)
+        voice_ids = [c['id'] for c in channels if c['type'] == VOICE]
+
+        # per member draws, made up front in bulk
+        role_counts = backend.tolist(backend.poisson(self.roles_per_member, n))
+        assigned = backend.tolist(
+            backend.choice(len(role_ids), sum(role_counts), self._role_weights())) \
+            if role_ids else []
+        flags = backend.tolist(backend.random(n * 4))
+        discriminators = backend.tolist(backend.ints(1, 10000, n))
+        names = backend.tolist(backend.ints(0, n, n))
+        statuses = list(self.statuses)
+        status_weights = [self.statuses[s] for s in statuses]
+        total = sum(status_weights)
+        status_picks = backend.tolist(
+            backend.choice(len(statuses), n, [w / total for w in status_weights]))
+        voice_picks = backend.tolist(backend.ints(0, max(1, len(voice_ids)), n))
+
+        members = []
+        presences = []
+        voice_states = []
+        joined = discord.utils.snowflake_time(guild_id).isoformat()
+        role_strs = [str(r) for r in role_ids]
+        cursor = 0
+        for index, user_id in enumerate(user_ids):
+            uid = str(user_id)
+            count = role_counts[index]
+            picks = assigned[cursor:cursor + count]
+            if count > 1:
+                picks = set(picks)
+            cursor += count
+            f = index * 4
+            members.append({
+                'user': {
+                    'id': uid,
+                    'username': 'user%d' % names[index],
+                    'discriminator': '%04d' % discriminators[index],
+                    'avatar': None,
+                    'bot': flags[f] < self.bot_ratio
+                },
+                'roles': [role_strs[r] for r in picks],
+                'nick': 'nick%d' % index if flags[f + 1] < self.nick_ratio else None,
+                'joined_at': joined,
+                'deaf': False,
+                'mute': False
+            })
+            presences.append({
+                'user': {'id': uid},
+                'status': statuses[status_picks[index]],
+                'game': {'name': 'game %d' % (names[index] % 50)}
+                if flags[f + 2] < self.game_ratio else None
+            })
+            if voice_ids and flags[f + 3] < self.voice_state_ratio:
+                voice_states.append({
+                    'user_id': uid,
+                    'channel_id': voice_ids[voice_picks[index]],
+                    'session_id': '%032x' % user_id,
+                    'deaf': False,
+                    'mute': False,
+                    'self_deaf': False,
+                    'self_mute': flags[f + 3] < self.voice_state_ratio / 3,
+                    'suppress': False
+                })
+
+        return {
+            'id': str(guild_id),
+            'name': 'generated guild %d' % self.seed,
+            'region': 'us-east',
+            'owner_id': members[0]['user']['id'] if members else None,
+            'member_count': n,
+            'large': n >= 250,
+            'roles': roles,
+            'channels': channels,
+            'members': members,
+            'presences': presences,
+            'voice_states': voice_states,
+            'emojis': [],
+            'features': []
+        }
+
+    def stream(self, chunk_size=1000):
+        """Yields the guild as gateway ``(event, payload)`` tuples.
+
+        First a GUILD_CREATE without members, presences or voice states,
+        then GUILD_MEMBERS_CHUNK payloads of ``chunk_size`` members each.
+        """
+        data = self.generate()
+        members = data.pop('members')
+        data.pop('presences')
+        data.pop('voice_states')
+        yield 'GUILD_CREATE', data
+
+        for start in range(0, len(members), chunk_size):
+            yield 'GUILD_MEMBERS_CHUNK', {
+                'guild_id': data['id'],
+                'members': members[start:start + chunk_size]
+            }
@@ -1,21 +1,57 @@
 # Stdlib
 import asyncio
+import bisect
 import collections
 import copy
+import time
 
 # External Libraries
 import discord
 
 # discord.py-test
-from discord_test import (Game, Status, VoiceState, TextChannel, VoiceChannel,
-                          CategoryChannel, AuditLogIterator)
+from discord_test import stats, trace
+from discord_test.cdn import _Response
+from discord_test import (Game, Colour, Member, Status, BanStore, ModelView,
+                          VoiceState, InviteStore, TextChannel, VoiceChannel,
+                          CategoryChannel, ConnectionState, AuditLogIterator,
+                          VoiceStateSnapshot, VOICE_STATE_FIELDS)
 
+_CHANNEL_CHANGED = 1 << VOICE_STATE_FIELDS.index('channel')
 
+_DAY = 86400
+
+_CHANNEL_TYPES = {
+    discord.ChannelType.text.value: TextChannel,
+    discord.ChannelType.voice.value: VoiceChannel,
+    discord.ChannelType.category.value: CategoryChannel
+}
+
+# before is None for new channels, fields is None when the object was
+# replaced instead of updated
+ChannelChange = collections.namedtuple('ChannelChange', 'before after fields')
+
+
+@stats.instrumented('get_member', 'get_channel', 'get_member_named', 'members',
+                    'channels', '_sync', '_update_voice_state')
 class Guild(discord.Guild):
-    def __init__(self, *, data):
+    # _role_map is role id -> role,
+    # _role_members is role id -> ids of the members with that role,
+    # _idle is day -> ids of the members without roles last active that
+    # day and _idle_days its keys in order, see _prunable
+    __slots__ = ('_role_map', '_role_members', '_idle', '_idle_days', 'ban_store',
+                 'invite_store')
+
+    def __init__(self, *, data, state=None):
         self._channels = {}
         self._members = {}
+        self._role_map = {}
+        self._role_members = {}
+        self._idle = {}
+        self._idle_days = []
+        self.ban_store = BanStore()
+        self.invite_store = InviteStore(self)
         self._voice_states = {}
+        self._state = state if state is not None else ConnectionState()
         self._from_data(data)
 
     def _add_channel(self, channel):
@@ -28,10 +64,126 @@ class Guild(discord.Guild):
         return self._voice_states.get(user_id)
 
     def _add_member(self, member):
+        old = self._members.get(member.id)
+        if old is not None:
+            self._remove_member(old)
         self._members[member.id] = member
+        self._reindex_roles(member.id, (), member._role_ids)
+        if not member._role_ids:
+            self._set_idle(member, True)
 
     def _remove_member(self, member):
-        self._members.pop(member.id, None)
+        old = self._members.pop(member.id, None)
+        if old is not None:
+            self._reindex_roles(old.id, old._role_ids, ())
+            if not old._role_ids:
+                self._set_idle(old, False)
+
+    def _reindex_member(self, member, before):
+        """Updates the indexes after the roles of ``member`` were ``before``."""
+        after = member._role_ids
+        self._reindex_roles(member.id, before, after)
+        if before and not after:
+            self._set_idle(member, True)
+        elif after and not before:
+            self._set_idle(member, False)
+
+    def _reindex_roles(self, member_id, before, after):
+        index = self._role_members
+        for role_id in set(before).difference(after):
+            ids = index.get(role_id)
+            if ids is not None:
+                ids.discard(member_id)
+                if not ids:
+                    del index[role_id]
+
+        for role_id in set(after).difference(before):
+            try:
+                index[role_id].add(member_id)
+            except KeyError:
+                index[role_id] = {member_id}
+
+    def _set_idle(self, member, idle):
+        day = int(member._last_active // _DAY)
+        if idle:
+            try:
+                self._idle[day].add(member.id)
+            except KeyError:
+                self._idle[day] = {member.id}
+                bisect.insort(self._idle_days, day)
+        else:
+            ids = self._idle.get(day)
+            if ids is not None:
+                ids.discard(member.id)
+                if not ids:
+                    del self._idle[day]
+                    self._idle_days.remove(day)
+
+    def _touch(self, member, when):
+        """Records activity of ``member`` at ``when``, in seconds since the epoch."""
+        if when <= member._last_active:
+            return
+
+        moved = (not member._role_ids and self._members.get(member.id) is member
+                 and int(when // _DAY) != int(member._last_active // _DAY))
+        if moved:
+            self._set_idle(member, False)
+        member._last_active = when
+        if moved:
+            self._set_idle(member, True)
+
+    def _prunable(self, days):
+        """Returns the ids of the members a prune of ``days`` would kick.
+
+        Only the members without roles are indexed, by the day they were
+        last active in, so this is a range query over the days before the
+        cutoff plus a check of the cutoff day itself. The ids come as a
+        list of collections, to be counted without copying them.
+        """
+        if not isinstance(days, int):
+            raise discord.InvalidArgument(
+                'Expected int for ``days``, received {0.__class__.__name__} instead.'.format(
+                    days))
+
+        cutoff = time.time() - days * _DAY
+        day = int(cutoff // _DAY)
+        idle = self._idle
+        ret = [idle[d] for d in self._idle_days[:bisect.bisect_left(self._idle_days, day)]]
+        edge = idle.get(day)
+        if edge:
+            members = self._members
+            ret.append([i for i in edge if members[i]._last_active < cutoff])
+
+        # the owner can't be kicked
+        owner = self._members.get(self.owner_id)
+        if owner is not None and not owner._role_ids and owner._last_active < cutoff:
+            ret = [[i for i in ids if i != owner.id] if owner.id in ids else ids
+                   for ids in ret]
+        return ret
+
+    def _role_ids_for(self, roles):
+        """Returns the sorted ids of ``roles``, without @everyone.
+
+        Raises NotFound for a role that isn't in the guild.
+        """
+        ids = set()
+        for role in roles:
+            if role.id not in self._role_map:
+                raise discord.NotFound(
+                    _Response(404, 'Not Found'), 'Unknown Role')
+            ids.add(role.id)
+        ids.discard(self.id)
+        return tuple(sorted(ids))
+
+    def _members_for(self, members):
+        ret = []
+        for member in members:
+            m = self._members.get(member.id)
+            if m is None:
+                raise discord.NotFound(
+                    _Response(404, 'Not Found'), 'Unknown Member')
+            ret.append(m)
+        return ret
 
     def __str__(self):
         return self.name
@@ -50,12 +202,13 @@ class Guild(discord.Guild):
             else:
                 after = self._voice_states[user_id]
 
-            before = copy.copy(after)
-            after._update(data, channel)
+            before = VoiceStateSnapshot(*after._update(data, channel))
         except KeyError:
             # if we're here then we're getting added into the cache
             after = VoiceState(data=data, channel=channel)
-            before = VoiceState(data=data, channel=None)
+            # the same state, only without a channel
+            before = VoiceStateSnapshot(after._values()[:-1] + (None, ),
+                                        _CHANNEL_CHANGED)
             self._voice_states[user_id] = after
 
         member = self.get_member(user_id)
@@ -71,10 +224,18 @@ class Guild(discord.Guild):
             r.position += bool(r.position)
 
         self.roles.append(role)
+        self._role_map[role.id] = role
 
     def _remove_role(self, role):
         # this raises ValueError if it fails..
         self.roles.remove(role)
+        self._role_map.pop(role.id, None)
+        gone = {role.id}
+        for member_id in self._role_members.pop(role.id, ()):
+            member = self._members[member_id]
+            member._remove_role_ids(gone)
+            if not member._role_ids:
+                self._set_idle(member, True)
 
         # since it didn't, we can change the positions now
         # basically the same as above except we only decrement
@@ -83,7 +244,51 @@ class Guild(discord.Guild):
             r.position -= r.position > role.position
 
     def _from_data(self, guild):
-        raise NotImplementedError
+        member_count = guild.get('member_count', None)
+        if member_count:
+            self._member_count = member_count
+
+        self.name = guild.get('name')
+        self.region = discord.enums.try_enum(discord.VoiceRegion,
+                                             guild.get('region'))
+        self.verification_level = discord.enums.try_enum(
+            discord.VerificationLevel, guild.get('verification_level'))
+        self.default_notifications = discord.enums.try_enum(
+            discord.NotificationLevel,
+            guild.get('default_message_notifications'))
+        self.explicit_content_filter = discord.enums.try_enum(
+            discord.ContentFilter, guild.get('explicit_content_filter', 0))
+        self.afk_timeout = guild.get('afk_timeout')
+        self.icon = guild.get('icon')
+        self.unavailable = guild.get('unavailable', False)
+        self.id = int(guild['id'])
+        self.roles = [
+            discord.Role(guild=self, data=r, state=self._state)
+            for r in guild.get('roles', [])
+        ]
+        self._role_map = {r.id: r for r in self.roles}
+        self.mfa_level = guild.get('mfa_level')
+        self.emojis = tuple(
+            discord.Emoji(guild=self, data=d, state=self._state)
+            for d in guild.get('emojis', []))
+        self.features = guild.get('features', [])
+        self.splash = guild.get('splash')
+        self._system_channel_id = discord.utils._get_as_snowflake(
+            guild, 'system_channel_id')
+
+        state = self._state
+        for mdata in guild.get('members', []):
+            self._add_member(Member(data=mdata, guild=self, state=state))
+
+        self._sync(guild)
+        self._large = None if member_count is None else self._member_count >= 250
+
+        self.owner_id = discord.utils._get_as_snowflake(guild, 'owner_id')
+        self.afk_channel = self.get_channel(
+            discord.utils._get_as_snowflake(guild, 'afk_channel_id'))
+
+        for obj in guild.get('voice_states', []):
+            self._update_voice_state(obj, int(obj['channel_id']))
 
     def _sync(self, data):
         try:
@@ -91,28 +296,58 @@ class Guild(discord.Guild):
         except KeyError:
             pass
 
+        now = time.time()
         for presence in data.get('presences', []):
             user_id = int(presence['user']['id'])
             member = self.get_member(user_id)
             if member is not None:
                 member.status = discord.enums.try_enum(Status,
                                                        presence['status'])
+                if member.status is not Status.offline:
+                    self._touch(member, now)
                 game = presence.get('game', {})
                 member.game = Game(**game) if game else None
 
-        if 'channels' in data:
-            channels = data['channels']
-            for c in channels:
-                if c['type'] == discord.ChannelType.text.value:
-                    self._add_channel(TextChannel(guild=self, data=c))
-                elif c['type'] == discord.ChannelType.voice.value:
-                    self._add_channel(VoiceChannel(guild=self, data=c))
-                elif c['type'] == discord.ChannelType.category.value:
-                    self._add_channel(CategoryChannel(guild=self, data=c))
+        changes = []
+        for c in data.get('channels', ()):
+            change = self._sync_channel(c)
+            if change is not None:
+                changes.append(change)
+        return changes
+
+    def _sync_channel(self, data):
+        """Applies a channel payload, as in GUILD_CREATE or CHANNEL_UPDATE.
+
+        Known channels are updated in place and only when a field differs,
+        so they keep their identity. Returns a :class:`ChannelChange`, or
+        None when nothing changed.
+        """
+        cls = _CHANNEL_TYPES.get(data['type'])
+        if cls is None:
+            return None
+
+        channel = self._channels.get(int(data['id']))
+        if channel is None or type(channel) is not cls:
+            new = cls(guild=self, data=data)
+            self._add_channel(new)
+            return ChannelChange(channel, new, None)
+
+        fields = channel._diff(data)
+        if not fields:
+            return None
+
+        before = copy.copy(channel)
+        channel._update(self, data)
+        return ChannelChange(before, channel, tuple(fields))
 
     @property
     def channels(self):
-        return list(self._channels.values())
+        """A live :class:`ModelView` of the channels, where discord.py returns a list.
+
+        Iterating and ``in`` don't copy, indexing walks the channels up to the
+        index. Use :meth:`ModelView.snapshot` for a list.
+        """
+        return ModelView(self._channels)
 
     @property
     def large(self):
@@ -188,11 +423,57 @@ class Guild(discord.Guild):
 
     @property
     def members(self):
-        return list(self._members.values())
+        """A live :class:`ModelView` of the members, where discord.py returns a list.
+
+        Iterating and ``in`` don't copy, indexing walks the members up to the
+        index. Use :meth:`ModelView.snapshot` for a list.
+        """
+        return ModelView(self._members)
 
     def get_member(self, user_id):
         return self._members.get(user_id)
 
+    def get_role(self, role_id):
+        return self._role_map.get(role_id)
+
+    def members_with_role(self, role):
+        """Returns the members that have ``role`` (a role or an id)."""
+        members = self._members
+        return [
+            members[i]
+            for i in self._role_members.get(getattr(role, 'id', role), ())
+        ]
+
+    def mentioned_members(self, message):
+        """Returns every member of the guild mentioned by ``message``.
+
+        That is the members mentioned directly, the members of every
+        mentioned role and, for @everyone or @here, every member or every
+        member that isn't offline. Role mentions go through the role index,
+        so the cost follows the number of members mentioned, not the number
+        of members times roles.
+        """
+        members = self._members
+        if message.mention_everyone:
+            content = message.content
+            if '@everyone' in content or '@here' not in content:
+                return list(members.values())
+
+            offline = discord.Status.offline
+            ids = {i for i, m in members.items() if m.status is not offline}
+        else:
+            ids = set()
+
+        for user in message.mentions:
+            if user.id in members:
+                ids.add(user.id)
+
+        index = self._role_members
+        for role in message.role_mentions:
+            ids.update(index.get(role.id, ()))
+
+        return [members[i] for i in ids]
+
     @discord.utils.cached_slot_property('_default_role')
     def default_role(self):
         return discord.utils.find(lambda r: r.is_default(), self.roles)
@@ -239,7 +520,10 @@ class Guild(discord.Guild):
 
     @property
     def shard_id(self):
-        raise NotImplementedError
+        count = self._state.shard_count
+        if count is None:
+            return None
+        return (self.id >> 22) % count
 
     @property
     def created_at(self):
@@ -269,14 +553,44 @@ class Guild(discord.Guild):
 
         return discord.utils.find(pred, members)
 
+    @asyncio.coroutine
     def _create_channel(self,
                         name,
                         overwrites,
                         channel_type,
                         category=None,
                         reason=None):
-        raise NotImplementedError
-
+        if overwrites is None:
+            overwrites = {}
+        elif not isinstance(overwrites, dict):
+            raise discord.InvalidArgument('overwrites parameter expects a dict.')
+
+        perms = []
+        for target, perm in overwrites.items():
+            if not isinstance(perm, discord.PermissionOverwrite):
+                raise discord.InvalidArgument(
+                    'Expected PermissionOverwrite received {0.__name__}'.format(
+                        type(perm)))
+
+            allow, deny = perm.pair()
+            perms.append({
+                'allow': allow.value,
+                'deny': deny.value,
+                'id': target.id,
+                'type': 'role' if isinstance(target, discord.Role) else 'member'
+            })
+
+        # new channels go to the bottom
+        return {
+            'id': self._state.snowflake(),
+            'type': channel_type.value,
+            'name': name,
+            'position': len(self._channels),
+            'parent_id': category.id if category is not None else None,
+            'permission_overwrites': perms
+        }
+
+    @trace.traced
     @asyncio.coroutine
     def create_text_channel(self,
                             name,
@@ -296,6 +610,7 @@ class Guild(discord.Guild):
         self._channels[channel.id] = channel
         return channel
 
+    @trace.traced
     @asyncio.coroutine
     def create_voice_channel(self,
                              name,
@@ -315,6 +630,7 @@ class Guild(discord.Guild):
         self._channels[channel.id] = channel
         return channel
 
+    @trace.traced
     @asyncio.coroutine
     def create_category(self, name, *, overwrites=None, reason=None):
         data = yield from self._create_channel(
@@ -327,61 +643,163 @@ class Guild(discord.Guild):
 
     create_category_channel = create_category
 
+    @trace.traced
     @asyncio.coroutine
     def leave(self):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def delete(self):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def edit(self, *, reason=None, **fields):
         raise NotImplementedError
 
     @asyncio.coroutine
     def bans(self):
-        raise NotImplementedError
+        return list(self.ban_store)
 
+    @trace.traced
     @asyncio.coroutine
     def prune_members(self, *, days, reason=None):
-        raise NotImplementedError
+        pruned = [i for ids in self._prunable(days) for i in ids]
+        members = self._members
+        for member_id in pruned:
+            self._remove_member(members[member_id])
+
+        try:
+            self._member_count -= len(pruned)
+        except AttributeError:
+            pass
+        return len(pruned)
 
     @asyncio.coroutine
     def webhooks(self):
-        raise NotImplementedError
+        return self._state.webhooks.for_guild(self.id)
 
     @asyncio.coroutine
     def estimate_pruned_members(self, *, days):
-        raise NotImplementedError
+        return sum(map(len, self._prunable(days)))
 
     @asyncio.coroutine
     def invites(self):
-        raise NotImplementedError
+        return list(self.invite_store)
 
+    @trace.traced
     @asyncio.coroutine
     def create_custom_emoji(self, *, name, image, reason=None):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def create_role(self, *, reason=None, **fields):
-        raise NotImplementedError
-
+        # like Discord, a new role starts with the @everyone permissions
+        permissions = fields.get('permissions', self.default_role.permissions)
+        colour = fields.get('colour', fields.get('color', Colour.default()))
+        data = {
+            'id': self._state.snowflake(),
+            'name': fields.get('name', 'new role'),
+            'permissions': permissions.value,
+            'color': colour.value,
+            'hoist': fields.get('hoist', False),
+            'mentionable': fields.get('mentionable', False),
+            'managed': False,
+            # right above @everyone
+            'position': 1
+        }
+        role = discord.Role(guild=self, data=data, state=self._state)
+        self._add_role(role)
+        return role
+
+    @trace.traced
+    @asyncio.coroutine
+    def bulk_add_roles(self, members, *roles, reason=None):
+        """Gives ``roles`` to every member of ``members`` at once.
+
+        Nothing changes when a role or a member isn't in the guild. The
+        role index is updated once per role. Returns the members that
+        gained a role.
+        """
+        ids = self._role_ids_for(roles)
+        changed = []
+        for member in self._members_for(members):
+            had_roles = bool(member._role_ids)
+            if member._add_role_ids(ids):
+                changed.append(member)
+                if not had_roles:
+                    self._set_idle(member, False)
+
+        if changed:
+            index = self._role_members
+            member_ids = [m.id for m in changed]
+            for role_id in ids:
+                try:
+                    index[role_id].update(member_ids)
+                except KeyError:
+                    index[role_id] = set(member_ids)
+        return changed
+
+    @trace.traced
+    @asyncio.coroutine
+    def bulk_remove_roles(self, members, *roles, reason=None):
+        """Takes ``roles`` from every member of ``members`` at once.
+
+        The counterpart of :meth:`bulk_add_roles`, returns the members
+        that lost a role.
+        """
+        ids = set(self._role_ids_for(roles))
+        changed = []
+        for member in self._members_for(members):
+            if member._remove_role_ids(ids):
+                changed.append(member)
+                if not member._role_ids:
+                    self._set_idle(member, True)
+
+        if changed:
+            index = self._role_members
+            member_ids = [m.id for m in changed]
+            for role_id in ids:
+                holders = index.get(role_id)
+                if holders is not None:
+                    holders.difference_update(member_ids)
+                    if not holders:
+                        del index[role_id]
+        return changed
+
+    @trace.traced
     @asyncio.coroutine
     def kick(self, user, *, reason=None):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def ban(self, user, *, reason=None, delete_message_days=1):
-        raise NotImplementedError
+        member = self._members.get(user.id)
+        if member is not None:
+            self._remove_member(member)
+            try:
+                self._member_count -= 1
+            except AttributeError:
+                pass
+
+        # bans keep the user, not the member
+        self.ban_store.add(getattr(user, '_user', user), reason)
 
+    @trace.traced
     @asyncio.coroutine
     def unban(self, user, *, reason=None):
-        raise NotImplementedError
+        if self.ban_store.remove(user) is None:
+            raise discord.NotFound(_Response(404, 'Not Found'), 'Unknown Ban')
 
     @asyncio.coroutine
     def vanity_invite(self):
-        raise NotImplementedError
+        invite = self.invite_store.vanity
+        if invite is None:
+            raise discord.Forbidden(_Response(403, 'Forbidden'), 'Missing Access')
+        return invite
 
     def ack(self):
         raise NotImplementedError
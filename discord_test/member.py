@@ -1,25 +1,138 @@
 # Stdlib
 import asyncio
+import bisect
+import calendar
 import copy
+import time
 
 # External Libraries
 import discord
 
 # discord.py-test
-from discord_test import Game, Colour
+from discord_test import stats, trace
+from discord_test.cdn import _Response
+from discord_test import Game, Colour, Messageable
+
+
+# the voice state fields tracked for changes, bit i of a mask is field i
+VOICE_STATE_FIELDS = ('session_id', 'deaf', 'mute', 'self_mute', 'self_deaf',
+                      'afk', 'channel')
 
 
 class VoiceState(discord.VoiceState):
     # Just a dataclass, works fine
-    pass
+    __slots__ = ()
+
+    def __init__(self, *, data, channel=None):
+        # discord.py calls _update here, which would diff unset fields
+        self.session_id = data.get('session_id')
+        super()._update(data, channel)
+
+    def _values(self):
+        return (self.session_id, self.deaf, self.mute, self.self_mute,
+                self.self_deaf, self.afk, self.channel)
+
+    def _update(self, data, channel):
+        """Updates the state.
 
+        Returns the field values from before the update and a mask of the
+        fields that changed.
+        """
+        before = self._values()
+        super()._update(data, channel)
+        mask = 0
+        for index, (old, new) in enumerate(zip(before, self._values())):
+            if old != new:
+                mask |= 1 << index
+        return before, mask
 
-class Member(discord.Member):
-    def __init__(self, *, data, guild):
-        # self._state = state
-        # self._user = state.store_user(data['user'])
+
+class VoiceStateSnapshot:
+    """Read-only voice state as it was before an update.
+
+    Only the field values are kept, in a tuple, so handing one to a
+    listener costs next to nothing. :meth:`materialize` builds a real
+    :class:`VoiceState` for the rare listener that needs one.
+    """
+    __slots__ = ('_values', 'changed')
+
+    def __init__(self, values, changed=0):
+        self._values = values
+        self.changed = changed
+
+    def __repr__(self):
+        return '<VoiceState self_mute={0.self_mute} self_deaf={0.self_deaf}' \
+               ' channel={0.channel!r}>'.format(self)
+
+    @property
+    def changed_fields(self):
+        return tuple(name for index, name in enumerate(VOICE_STATE_FIELDS)
+                     if self.changed & (1 << index))
+
+    def materialize(self):
+        state = VoiceState.__new__(VoiceState)
+        for name, value in zip(VOICE_STATE_FIELDS, self._values):
+            setattr(state, name, value)
+        return state
+
+
+def _timestamp(when):
+    return calendar.timegm(when.utctimetuple()) if when is not None else 0.0
+
+
+def _contains(ids, value):
+    index = bisect.bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def _merge(ids, new):
+    """Merges two sorted id tuples into one, without duplicates."""
+    if len(new) == 1:
+        index = bisect.bisect_left(ids, new[0])
+        if index < len(ids) and ids[index] == new[0]:
+            return ids
+        return ids[:index] + new + ids[index:]
+
+    ret = []
+    i = j = 0
+    while i < len(ids) and j < len(new):
+        a, b = ids[i], new[j]
+        if a < b:
+            ret.append(a)
+            i += 1
+        elif b < a:
+            ret.append(b)
+            j += 1
+        else:
+            ret.append(a)
+            i += 1
+            j += 1
+    ret.extend(ids[i:])
+    ret.extend(new[j:])
+    return tuple(ret)
+
+
+def _snapshot_field(index):
+    return property(lambda self: self._values[index])
+
+
+for _index, _name in enumerate(VOICE_STATE_FIELDS):
+    setattr(VoiceStateSnapshot, _name, _snapshot_field(_index))
+
+
+@stats.instrumented('guild_permissions', '_update', '_update_roles',
+                    '_presence_update')
+class Member(Messageable, discord.Member):
+    # _role_ids is the sorted tuple of role ids without @everyone,
+    # _last_active is when the member was last seen, in seconds since the epoch
+    __slots__ = ('_role_ids', '_last_active')
+
+    def __init__(self, *, data, guild, state=None):
+        self._state = state if state is not None else guild._state
+        self._user = self._state.store_user(data['user'])
         self.guild = guild
         self.joined_at = discord.utils.parse_time(data.get('joined_at'))
+        self._last_active = _timestamp(self.joined_at)
         self._update_roles(data)
         self.status = discord.Status.offline
         game = data.get('game', {})
@@ -47,17 +160,59 @@ class Member(discord.Member):
         ch = yield from self.create_dm()
         return ch
 
+    @property
+    def dm_channel(self):
+        return self._state._get_private_channel_by_user(self._user.id)
+
+    @asyncio.coroutine
+    def create_dm(self):
+        return self._state.create_dm(self._user)
+
     def _update_roles(self, data):
-        # update the roles
-        self.roles = [self.guild.default_role]
-        for roleid in map(int, data['roles']):
-            role = discord.utils.find(lambda r: r.id == roleid,
-                                      self.guild.roles)
-            if role is not None:
-                self.roles.append(role)
+        guild = self.guild
+        before = getattr(self, '_role_ids', ())
+        roles = guild._role_map
+
+        # @everyone is left out, every member has it
+        ids = sorted({
+            i for i in map(int, data['roles']) if i in roles and i != guild.id
+        })
+        self._role_ids = tuple(ids)
 
         # sort the roles by hierarchy since they can be "randomised"
-        self.roles.sort()
+        self.roles = [guild.default_role] + sorted(roles[i] for i in ids)
+        if guild._members.get(self.id) is self:
+            guild._reindex_member(self, before)
+
+    def _add_role_ids(self, ids):
+        """Merges the sorted ``ids`` into the roles, returns the ones that were new.
+
+        The id array is merged and the new roles are inserted in hierarchy
+        order, nothing gets sorted again. The indexes are left to the
+        caller, so bulk edits can update them once.
+        """
+        before = self._role_ids
+        new = tuple(i for i in ids if not _contains(before, i))
+        if new:
+            self._role_ids = _merge(before, new)
+            get_role = self.guild.get_role
+            for role_id in new:
+                bisect.insort(self.roles, get_role(role_id))
+        return new
+
+    def _remove_role_ids(self, ids):
+        """Drops the ``ids`` (a set) from the roles, returns the ones that were there."""
+        before = self._role_ids
+        gone = tuple(i for i in before if i in ids)
+        if gone:
+            self._role_ids = tuple(i for i in before if i not in ids)
+            self.roles = [r for r in self.roles if r.id not in ids]
+        return gone
+
+    def _roles_changed(self, before):
+        guild = self.guild
+        if guild._members.get(self.id) is self:
+            guild._reindex_member(self, before)
 
     def _update(self, data, user=None):
         if user:
@@ -77,6 +232,8 @@ class Member(discord.Member):
 
     def _presence_update(self, data, user):
         self.status = discord.enums.try_enum(discord.Status, data['status'])
+        if self.status is not discord.Status.offline:
+            self.guild._touch(self, time.time())
         game = data.get('game', {})
         self.game = Game(**game) if game else None
         u = self._user
@@ -117,12 +274,8 @@ class Member(discord.Member):
         if self._user.mentioned_in(message):
             return True
 
-        for role in message.role_mentions:
-            has_role = discord.utils.get(self.roles, id=role.id) is not None
-            if has_role:
-                return True
-
-        return False
+        role_ids = self._role_ids
+        return any(_contains(role_ids, role.id) for role in message.role_mentions)
 
     def permissions_in(self, channel):
         return channel.permissions_for(self)
@@ -133,17 +286,18 @@ class Member(discord.Member):
 
     @property
     def guild_permissions(self):
-        if self.guild.owner == self:
+        # not cached, role permissions and the owner can change behind our back
+        if self.guild.owner_id == self.id:
             return discord.Permissions.all()
 
-        base = discord.Permissions.none()
+        value = 0
         for r in self.roles:
-            base.value |= r.permissions.value
+            value |= r.permissions.value
 
-        if base.administrator:
+        permissions = discord.Permissions(value)
+        if permissions.administrator:
             return discord.Permissions.all()
-
-        return base
+        return permissions
 
     @property
     def voice(self):
@@ -161,18 +315,58 @@ class Member(discord.Member):
     def kick(self, *, reason=None):
         yield from self.guild.kick(self, reason=reason)
 
+    @trace.traced
     @asyncio.coroutine
     def edit(self, *, reason=None, **fields):
-        raise NotImplementedError
+        guild = self.guild
+        # everything is checked before anything changes
+        ids = guild._role_ids_for(fields['roles']) if 'roles' in fields else None
+        voice = guild._voice_state_for(self._user.id)
+        if voice is None and fields.keys() & {'mute', 'deafen', 'voice_channel'}:
+            raise discord.HTTPException(
+                _Response(400, 'Bad Request'),
+                'Target user is not connected to voice.')
+
+        if 'nick' in fields:
+            # an empty nickname resets it, like None
+            self.nick = fields['nick'] or None
+
+        if 'mute' in fields:
+            voice.mute = fields['mute']
+
+        if 'deafen' in fields:
+            voice.deaf = fields['deafen']
+
+        if 'voice_channel' in fields:
+            channel = fields['voice_channel']
+            if channel is None:
+                guild._voice_states.pop(self._user.id, None)
+            else:
+                voice.channel = channel
+
+        if ids is not None:
+            before = self._role_ids
+            removed = self._remove_role_ids(set(before).difference(ids))
+            added = self._add_role_ids(ids)
+            if removed or added:
+                self._roles_changed(before)
 
     @asyncio.coroutine
     def move_to(self, channel, *, reason=None):
         yield from self.edit(voice_channel=channel, reason=reason)
 
+    @trace.traced
     @asyncio.coroutine
     def add_roles(self, *roles, reason=None, atomic=True):
-        raise NotImplementedError
+        # atomic only changes how discord.py talks to the API,
+        # the fake applies all the roles at once either way
+        before = self._role_ids
+        if self._add_role_ids(self.guild._role_ids_for(roles)):
+            self._roles_changed(before)
 
+    @trace.traced
     @asyncio.coroutine
     def remove_roles(self, *roles, reason=None, atomic=True):
-        raise NotImplementedError
+        before = self._role_ids
+        if self._remove_role_ids(set(self.guild._role_ids_for(roles))):
+            self._roles_changed(before)
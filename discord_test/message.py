@@ -1,16 +1,23 @@
 # Stdlib
 import asyncio
+import datetime
 import re
+import types
 
 # External Libraries
 import discord
 
 # discord.py-test
-from discord_test import Embed, Reaction, CallMessage
+from discord_test import stats, trace
+from discord_test import Embed, CallMessage, ReactionStore
 
 
 class Attachment(discord.Attachment):
-    def __init__(self, *, data):
+    __slots__ = ()
+
+    def __init__(self, *, data, state=None):
+        # the fake CDN stands in for the HTTP client
+        self._http = state.cdn if state is not None else None
         self.id = int(data['id'])
         self.size = data['size']
         self.height = data.get('height')
@@ -21,17 +28,78 @@ class Attachment(discord.Attachment):
 
     @asyncio.coroutine
     def save(self, fp, *, seek_begin=True):
-        raise NotImplementedError
+        # a memoryview of the blob, written out without copying it first
+        data = yield from self._http.get_attachment(self.url)
+        if isinstance(fp, str):
+            with open(fp, 'wb') as f:
+                return f.write(data)
+        else:
+            written = fp.write(data)
+            if seek_begin:
+                fp.seek(0)
+            return written
 
+    def iter_chunks(self, chunk_size=1 << 16):
+        """Asynchronously iterates over the attachment in memoryview slices."""
+        return self._http.iter_chunks(self.url, chunk_size)
 
+
+@stats.instrumented('clean_content', '_update')
 class Message(discord.Message):
-    def __init__(self, *, channel, data):
+    # embeds and attachments are kept as raw payloads until first read
+    __slots__ = ('_reactions', '_raw_embeds', '_cs_embeds', '_raw_attachments',
+                 '_cs_attachments')
+
+    def __init__(self, *, channel, data, state=None, users=None):
+        self._state = state if state is not None else channel._state
         self.id = int(data['id'])
         self.webhook_id = discord.utils._get_as_snowflake(data, 'webhook_id')
-        self.reactions = [
-            Reaction(message=self, data=d) for d in data.get('reactions', [])
-        ]
-        self._update(channel, data)
+        self._reactions = ReactionStore(self, data.get('reactions', []))
+        self._raw_embeds = self._raw_attachments = ()
+        self._update(channel, data, users)
+
+        # a message counts as activity of its author, see Guild._prunable
+        guild = getattr(channel, 'guild', None)
+        if guild is not None and 'author' in data:
+            member = guild._members.get(int(data['author']['id']))
+            if member is not None:
+                guild._touch(member, ((self.id >> 22) + discord.utils.DISCORD_EPOCH) / 1000)
+
+    @classmethod
+    def batch(cls, payloads, *, channel=None, guild=None, state=None):
+        """Builds messages from many raw payloads at once.
+
+        The messages belong to ``channel`` or, with ``guild`` given instead,
+        to the channel named by each payload's ``channel_id``. The authors
+        and mentions of the whole batch are interned in a single pass over
+        the user store and resolved to members of the guild where possible.
+        """
+        payloads = list(payloads)
+        if guild is None:
+            guild = getattr(channel, 'guild', None)
+        if state is None:
+            state = (channel if channel is not None else guild)._state
+
+        users = []
+        for data in payloads:
+            try:
+                users.append(data['author'])
+            except KeyError:
+                pass
+            users.extend(data.get('mentions', ()))
+
+        members = guild._members if guild is not None else {}
+        resolved = {}
+        for user in state.store_users(users):
+            resolved[user.id] = members.get(user.id, user)
+
+        ret = []
+        for data in payloads:
+            target = channel
+            if target is None:
+                target = guild.get_channel(int(data['channel_id']))
+            ret.append(cls(channel=target, data=data, state=state, users=resolved))
+        return ret
 
     def __repr__(self):
         return '<Message id={0.id} pinned={0.pinned} author={0.author!r}>'.format(
@@ -49,12 +117,30 @@ class Message(discord.Message):
                 setattr(self, key, transform(value))
 
     def _add_reaction(self, data, emoji, user_id):
-        raise NotImplementedError
+        is_me = data['me'] = user_id == self._state.self_id
+        reaction = self._reactions.add(emoji, user_id, me=is_me)
+        return reaction if reaction is not None else self._reactions.get(emoji)
 
     def _remove_reaction(self, data, emoji, user_id):
-        raise NotImplementedError
+        if emoji not in self._reactions:
+            raise ValueError('Emoji already removed?')
+
+        reaction = self._reactions.get(emoji)
+        removed = self._reactions.remove(
+            emoji, user_id, me=user_id == self._state.self_id)
+        return removed if removed is not None else reaction
+
+    @property
+    def reactions(self):
+        return list(self._reactions)
+
+    def has_reacted(self, emoji, user):
+        """Checks whether ``user`` (a user or an id) reacted with ``emoji``."""
+        if isinstance(emoji, discord.Reaction):
+            emoji = emoji.emoji
+        return self._reactions.reacted(emoji, getattr(user, 'id', user))
 
-    def _update(self, channel, data):
+    def _update(self, channel, data, users=None):
         self.channel = channel
         self._edited_timestamp = discord.utils.parse_time(
             data.get('edited_timestamp'))
@@ -65,38 +151,67 @@ class Message(discord.Message):
             data, 'type',
             lambda x: discord.enums.try_enum(discord.MessageType, x))
         self._try_patch(data, 'content')
-        self._try_patch(
-            data, 'attachments',
-            lambda x: [Attachment(data=a, state=self._state) for a in x])
-        self._try_patch(data, 'embeds',
-                        lambda x: list(map(Embed.from_data, x)))
         self._try_patch(data, 'nonce')
 
-        for handler in ('author', 'mentions', 'mention_roles', 'call'):
+        # decoded again only when the payload brings new ones
+        for key in ('attachments', 'embeds'):
+            try:
+                raw = data[key]
+            except KeyError:
+                continue
+            setattr(self, '_raw_' + key, raw)
+            try:
+                delattr(self, '_cs_' + key)
+            except AttributeError:
+                pass
+
+        # users maps ids to already resolved users, see batch
+        for handler in ('author', 'mentions'):
+            try:
+                value = data[handler]
+            except KeyError:
+                continue
+            getattr(self, '_handle_%s' % handler)(value, users)
+
+        for handler in ('mention_roles', 'call'):
             try:
                 getattr(self, '_handle_%s' % handler)(data[handler])
             except KeyError:
                 continue
 
         # clear the cached properties
-        cached = filter(lambda attr: attr.startswith('_cs_'), self.__slots__)
-        for attr in cached:
+        for attr in self._cached_slots:
             try:
                 delattr(self, attr)
             except AttributeError:
                 pass
 
-    def _handle_author(self, author):
-        raise NotImplementedError
+    def _resolve_user(self, data, users):
+        user_id = int(data['id'])
+        if users is not None:
+            try:
+                return users[user_id]
+            except KeyError:
+                pass
 
-    def _handle_mentions(self, mentions):
-        raise NotImplementedError
+        guild = self.guild
+        found = guild.get_member(user_id) if guild is not None else None
+        if found is None:
+            found = self._state.store_user(data)
+        return found
+
+    def _handle_author(self, author, users=None):
+        self.author = self._resolve_user(author, users)
+
+    def _handle_mentions(self, mentions, users=None):
+        self.mentions = [self._resolve_user(m, users) for m in mentions]
 
     def _handle_mention_roles(self, role_mentions):
         self.role_mentions = []
-        if self.guild is not None:
+        guild = self.guild
+        if guild is not None:
             for role_id in map(int, role_mentions):
-                role = discord.utils.get(self.guild.roles, id=role_id)
+                role = guild.get_role(role_id)
                 if role is not None:
                     self.role_mentions.append(role)
 
@@ -108,17 +223,40 @@ class Message(discord.Message):
         # we get the participant source from the mentions array or
         # the author
 
-        participants = []
-        for uid in map(int, call.get('participants', [])):
-            if uid == self.author.id:
-                participants.append(self.author)
-            else:
-                user = discord.utils.find(lambda u: u.id == uid, self.mentions)
-                if user is not None:
-                    participants.append(user)
+        sources = {u.id: u for u in self.mentions}
+        sources[self.author.id] = self.author
+        participants = [
+            sources[uid] for uid in map(int, call.get('participants', []))
+            if uid in sources
+        ]
+
+        self.call = CallMessage(message=self, **dict(call, participants=participants))
 
-        call['participants'] = participants
-        self.call = CallMessage(message=self, **call)
+    @property
+    def embeds(self):
+        try:
+            return self._cs_embeds
+        except AttributeError:
+            self._cs_embeds = list(map(Embed.from_data, self._raw_embeds))
+            return self._cs_embeds
+
+    @embeds.setter
+    def embeds(self, value):
+        self._cs_embeds = value
+
+    @property
+    def attachments(self):
+        try:
+            return self._cs_attachments
+        except AttributeError:
+            self._cs_attachments = [
+                Attachment(data=a, state=self._state) for a in self._raw_attachments
+            ]
+            return self._cs_attachments
+
+    @attachments.setter
+    def attachments(self, value):
+        self._cs_attachments = value
 
     @discord.utils.cached_slot_property('_cs_guild')
     def guild(self):
@@ -282,33 +420,83 @@ class Message(discord.Message):
                 return '{0.author.name} started a call \N{EM DASH} Join the call.'.format(
                     self)
 
+    @trace.traced
     @asyncio.coroutine
     def delete(self):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def edit(self, **fields):
-        raise NotImplementedError
+        data = {'edited_timestamp': datetime.datetime.utcnow().isoformat()}
+        try:
+            content = fields['content']
+        except KeyError:
+            pass
+        else:
+            data['content'] = str(content) if content is not None else ''
+
+        try:
+            embed = fields['embed']
+        except KeyError:
+            pass
+        else:
+            data['embeds'] = [embed.to_dict()] if embed is not None else []
 
+        self._update(self.channel, data)
+        self._state.outbox.record_edit(self)
+
+    @trace.traced
     @asyncio.coroutine
     def pin(self):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def unpin(self):
         raise NotImplementedError
 
+    @trace.traced
     @asyncio.coroutine
     def add_reaction(self, emoji):
-        raise NotImplementedError
+        if isinstance(emoji, discord.Reaction):
+            emoji = emoji.emoji
+        self._add_reaction({}, emoji, self._state.self_id)
 
+    @trace.traced
     @asyncio.coroutine
     def remove_reaction(self, emoji, member):
-        raise NotImplementedError
+        if isinstance(emoji, discord.Reaction):
+            emoji = emoji.emoji
+        self._remove_reaction({}, emoji, member.id)
 
+    @trace.traced
     @asyncio.coroutine
     def clear_reactions(self):
-        raise NotImplementedError
+        self._reactions.clear()
 
     def ack(self):
         raise NotImplementedError
+
+    def _copy(self):
+        """A shallow copy, which later edits of this message don't touch."""
+        copy = Message.__new__(self.__class__)
+        for attr in self._all_slots:
+            try:
+                setattr(copy, attr, getattr(self, attr))
+            except AttributeError:
+                pass
+        return copy
+
+
+# self.__slots__ only holds the slots declared by the fake itself,
+# embeds and attachments are dropped by _update only when they change
+Message._cached_slots = tuple(
+    attr for cls in Message.__mro__ for attr in getattr(cls, '__slots__', ())
+    if attr.startswith('_cs_') and attr not in ('_cs_embeds', '_cs_attachments'))
+# _update replaces what it changes instead of mutating it, so sharing the
+# values between copies is safe. Slots shadowed by a property of the fake,
+# like embeds, are left to the slots behind the property.
+Message._all_slots = tuple(
+    attr for cls in Message.__mro__ for attr in getattr(cls, '__slots__', ())
+    if isinstance(getattr(Message, attr, None), types.MemberDescriptorType))
@@ -0,0 +1,243 @@
+# Stdlib
+import asyncio
+import bisect
+import collections
+import datetime
+import string
+
+# External Libraries
+import discord
+
+# discord.py-test
+from discord_test.cdn import _Response
+
+BanEntry = collections.namedtuple('BanEntry', 'reason user')
+
+_ALPHABET = string.digits + string.ascii_letters
+
+
+def _user_id(user):
+    return getattr(user, 'id', user)
+
+
+def _code(number):
+    chars = []
+    while number:
+        number, digit = divmod(number, len(_ALPHABET))
+        chars.append(_ALPHABET[digit])
+    return ''.join(chars)
+
+
+class BanStore:
+    """Bans of a single guild, keyed by user id.
+
+    Checking whether a user is banned is a dict lookup. Bans are listed by
+    user id, the way the API pages them, from an id array that is sorted
+    when first needed after a change, so a burst of bans costs one sort.
+    """
+
+    def __init__(self):
+        self._bans = {}
+        self._order = None
+
+    def __len__(self):
+        return len(self._bans)
+
+    def __iter__(self):
+        bans = self._bans
+        return (bans[i] for i in self._sorted())
+
+    def __contains__(self, user):
+        return _user_id(user) in self._bans
+
+    def _sorted(self):
+        if self._order is None:
+            self._order = sorted(self._bans)
+        return self._order
+
+    def get(self, user):
+        """The :class:`BanEntry` of ``user`` (a user or an id), or None."""
+        return self._bans.get(_user_id(user))
+
+    def add(self, user, reason=None):
+        if user.id not in self._bans:
+            self._order = None
+        entry = self._bans[user.id] = BanEntry(reason, user)
+        return entry
+
+    def bulk_add(self, users, reason=None):
+        """Bans every user of ``users``, returning how many weren't banned yet."""
+        bans = self._bans
+        before = len(bans)
+        for user in users:
+            bans[user.id] = BanEntry(reason, user)
+
+        added = len(bans) - before
+        if added:
+            self._order = None
+        return added
+
+    def remove(self, user):
+        entry = self._bans.pop(_user_id(user), None)
+        if entry is not None:
+            self._order = None
+        return entry
+
+    def page(self, *, limit=1000, before=None, after=None):
+        """Returns up to ``limit`` bans in user id order.
+
+        ``before`` and ``after`` take a user or an id, and only bans of
+        users with a lower or higher id are returned.
+        """
+        order = self._sorted()
+        if before is not None:
+            end = bisect.bisect_left(order, _user_id(before))
+            ids = order[max(0, end - limit):end]
+        else:
+            start = 0 if after is None else bisect.bisect_right(order, _user_id(after))
+            ids = order[start:start + limit]
+
+        bans = self._bans
+        return [bans[i] for i in ids]
+
+    def clear(self):
+        self._bans.clear()
+        self._order = None
+
+
+class Invite(discord.Invite):
+    __slots__ = ('_store', )
+
+    def __init__(self, *, data, channel, store):
+        self._store = store
+        self._state = channel._state
+        self.code = data['code']
+        self.guild = channel.guild
+        self.channel = channel
+        self.max_age = data.get('max_age', 0)
+        self.max_uses = data.get('max_uses', 0)
+        self.temporary = data.get('temporary', False)
+        self.uses = data.get('uses', 0)
+        self.revoked = data.get('revoked', False)
+        self.created_at = discord.utils.parse_time(data.get('created_at'))
+        inviter = data.get('inviter')
+        self.inviter = None if inviter is None else self._state.store_user(inviter)
+
+    def __repr__(self):
+        return '<Invite code={0.code!r} uses={0.uses} max_uses={0.max_uses}>'.format(self)
+
+    def expired(self, now=None):
+        if not self.max_age:
+            return False
+        now = now or datetime.datetime.utcnow()
+        return self.created_at + datetime.timedelta(seconds=self.max_age) <= now
+
+    @asyncio.coroutine
+    def delete(self, *, reason=None):
+        self._store.remove(self)
+
+
+class InviteStore:
+    """Invites of a single guild, keyed by code.
+
+    Every use is counted on the invite and per inviter, the numbers
+    invite-tracking bots compare between member joins. Invites that ran
+    out of uses are deleted and expired ones are dropped when listed or
+    used, like Discord does.
+    """
+
+    def __init__(self, guild):
+        self.guild = guild
+        self._invites = collections.OrderedDict()
+        self._uses = collections.Counter()
+        self.vanity = None
+
+    def __len__(self):
+        self._expire()
+        return len(self._invites)
+
+    def __iter__(self):
+        self._expire()
+        return iter(list(self._invites.values()))
+
+    def __contains__(self, code):
+        return getattr(code, 'code', code) in self._invites
+
+    def _expire(self):
+        now = datetime.datetime.utcnow()
+        for code in [c for c, i in self._invites.items() if i.expired(now)]:
+            del self._invites[code]
+
+    def get(self, code):
+        invite = self._invites.get(code)
+        if invite is not None and invite.expired():
+            del self._invites[code]
+            return None
+        return invite
+
+    def for_channel(self, channel_id):
+        return [i for i in self if i.channel.id == channel_id]
+
+    def create(self, channel, *, inviter=None, max_age=0, max_uses=0,
+               temporary=False, unique=True):
+        if not unique:
+            # Discord hands out an existing invite with the same settings
+            for invite in self.for_channel(channel.id):
+                if (invite.max_age, invite.max_uses, invite.temporary) == \
+                        (max_age, max_uses, temporary) and invite.inviter == inviter:
+                    return invite
+
+        data = {
+            'code': _code(channel._state.snowflake()),
+            'max_age': max_age,
+            'max_uses': max_uses,
+            'temporary': temporary,
+            'created_at': datetime.datetime.utcnow().isoformat()
+        }
+        invite = Invite(data=data, channel=channel, store=self)
+        invite.inviter = inviter
+        self._invites[invite.code] = invite
+        return invite
+
+    def set_vanity(self, code, channel):
+        """Gives the guild a vanity invite, counted like any other."""
+        self.vanity = Invite(
+            data={'code': code, 'created_at': datetime.datetime.utcnow().isoformat()},
+            channel=channel,
+            store=self)
+        return self.vanity
+
+    def use(self, code):
+        """Counts a join through ``code`` and returns the invite.
+
+        Raises NotFound for codes that don't exist or expired.
+        """
+        vanity = self.vanity
+        if vanity is not None and vanity.code == code:
+            invite = vanity
+        else:
+            invite = self.get(code)
+            if invite is None:
+                raise discord.NotFound(_Response(404, 'Not Found'), 'Unknown Invite')
+
+        invite.uses += 1
+        if invite.inviter is not None:
+            self._uses[invite.inviter.id] += 1
+        if invite.max_uses and invite.uses >= invite.max_uses:
+            self._invites.pop(invite.code, None)
+        return invite
+
+    def uses_by(self, user):
+        """How many joins the invites of ``user`` (a user or an id) brought in."""
+        return self._uses[_user_id(user)]
+
+    def remove(self, invite):
+        if invite is self.vanity:
+            self.vanity = None
+        else:
+            self._invites.pop(invite.code, None)
+
+    def clear(self):
+        self._invites.clear()
+        self._uses.clear()
+        self.vanity = None
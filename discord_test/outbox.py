@@ -0,0 +1,160 @@
+# Stdlib
+import collections
+import json
+import re
+import time
+
+# discord.py-test
+from discord_test import Message
+
+OutboxEntry = collections.namedtuple('OutboxEntry', 'kind timestamp message')
+
+
+class Outbox:
+    """Records every message the bot sends or edits through the fakes.
+
+    Entries are kept in a ring buffer of ``maxlen`` entries and indexed
+    per channel, so the latest message of a channel is a dict lookup away.
+    Each entry holds a copy of the message as it was when sent or edited.
+    Files sent along are stored in the fake CDN and show up as attachments.
+    With ``stream`` set to a path or a text file, every entry is also
+    written out as a line of JSON for soak runs that outlive the buffer.
+    """
+
+    def __init__(self, state, *, maxlen=10000, stream=None):
+        self._state = state
+        self.maxlen = maxlen
+        self.sent = 0
+        self.edited = 0
+        self._entries = collections.deque()
+        self._channels = {}
+        self._stream = None
+        self._owns_stream = False
+        if stream is not None:
+            self.stream_to(stream)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def stream_to(self, stream):
+        self.close()
+        if isinstance(stream, str):
+            self._stream = open(stream, 'a')
+            self._owns_stream = True
+        else:
+            self._stream = stream
+
+    def close(self):
+        if self._owns_stream:
+            self._stream.close()
+        self._stream = None
+        self._owns_stream = False
+
+    def _record(self, kind, message):
+        if len(self._entries) >= self.maxlen:
+            old = self._entries.popleft()
+            channel_id = old.message.channel.id
+            entries = self._channels[channel_id]
+            entries.popleft()
+            if not entries:
+                del self._channels[channel_id]
+
+        # a copy, so a later edit doesn't rewrite the entries before it
+        entry = OutboxEntry(kind, time.time(), message._copy())
+        self._entries.append(entry)
+        try:
+            self._channels[message.channel.id].append(entry)
+        except KeyError:
+            self._channels[message.channel.id] = collections.deque((entry, ))
+
+        if self._stream is not None:
+            self._stream.write(json.dumps({
+                'kind': kind,
+                'timestamp': entry.timestamp,
+                'channel_id': message.channel.id,
+                'message_id': message.id,
+                'content': message.content,
+                'embeds': [e.to_dict() for e in message.embeds],
+                'attachments': [a.filename for a in message.attachments]
+            }) + '\n')
+        return entry
+
+    def _mentions(self, channel, content):
+        guild = getattr(channel, 'guild', None)
+        state = self._state
+        ret = []
+        for user_id in map(int, re.findall(r'<@!?([0-9]+)>', content)):
+            found = guild.get_member(user_id) if guild is not None else None
+            if found is None:
+                found = state.get_user(user_id)
+            if found is not None:
+                ret.append({'id': user_id})
+        return ret
+
+    def send(self, channel, content=None, *, tts=False, embed=None, files=(), nonce=None):
+        state = self._state
+        content = str(content) if content is not None else ''
+        trace = state.trace
+        if trace is not None:
+            # nonces are left out, bots tend to make them random
+            trace.record('Messageable.send', channel.id, (content, ), {
+                'tts': tts,
+                'embed': embed
+            })
+        data = {
+            'id': state.snowflake(),
+            'type': 0,
+            'content': content,
+            'tts': tts,
+            'pinned': False,
+            'nonce': nonce,
+            'embeds': [embed.to_dict()] if embed is not None else [],
+            'attachments': [
+                state.cdn.put_attachment(channel.id, state.snowflake(), f) for f in files
+            ],
+            'mention_everyone': '@everyone' in content or '@here' in content,
+            'mentions': self._mentions(channel, content),
+            'mention_roles': re.findall(r'<@&([0-9]+)>', content),
+            'edited_timestamp': None
+        }
+
+        user = state.user
+        if user is not None:
+            data['author'] = {
+                'id': user.id,
+                'username': user.name,
+                'discriminator': user.discriminator,
+                'avatar': user.avatar,
+                'bot': user.bot
+            }
+
+        message = Message(channel=channel, data=data, state=state)
+        if user is None:
+            message.author = None
+
+        self.sent += 1
+        self._record('send', message)
+        return message
+
+    def record_edit(self, message):
+        self.edited += 1
+        return self._record('edit', message)
+
+    def last(self, channel=None):
+        """The latest message sent or edited, optionally in ``channel``."""
+        if channel is None:
+            entries = self._entries
+        else:
+            entries = self._channels.get(getattr(channel, 'id', channel), ())
+        return entries[-1].message if entries else None
+
+    def for_channel(self, channel):
+        entries = self._channels.get(getattr(channel, 'id', channel), ())
+        return [entry.message for entry in entries]
+
+    def clear(self):
+        self._entries.clear()
+        self._channels.clear()
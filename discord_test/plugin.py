@@ -0,0 +1,37 @@
+# Stdlib
+import os
+import re
+
+# External Libraries
+import pytest
+
+# discord.py-test
+from discord_test import stats
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('discord_test')
+    group.addoption(
+        '--dt-profile',
+        metavar='DIR',
+        default=None,
+        help='write a hot path profile of the fake objects for every test '
+        'into DIR')
+
+
+def _report_path(directory, nodeid):
+    return os.path.join(directory, re.sub(r'[^\w.-]+', '_', nodeid) + '.json')
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    directory = item.config.getoption('dt_profile')
+    if directory is None:
+        yield
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    with stats.profile(item.nodeid) as prof:
+        yield
+
+    prof.dump(_report_path(directory, item.nodeid))
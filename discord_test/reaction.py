@@ -0,0 +1,167 @@
+# Stdlib
+import asyncio
+import collections
+
+# External Libraries
+import discord
+
+
+def _key(emoji):
+    if isinstance(emoji, str):
+        return emoji
+    return emoji.id or emoji.name
+
+
+class ReactionStore:
+    """Reactions of a single message, keyed by emoji.
+
+    Alongside each :class:`discord.Reaction` it keeps the ids of the users
+    that reacted with it, so adding, removing and checking a reaction are
+    all constant time.
+    """
+    __slots__ = ('message', '_reactions', '_users')
+
+    def __init__(self, message, data=()):
+        self.message = message
+        self._reactions = collections.OrderedDict()
+        self._users = {}
+        for d in data:
+            emoji = message._state.get_reaction_emoji(d['emoji'])
+            key = _key(emoji)
+            self._reactions[key] = discord.Reaction(
+                message=message, data=d, emoji=emoji)
+            self._users[key] = set()
+
+    def __iter__(self):
+        return iter(self._reactions.values())
+
+    def __len__(self):
+        return len(self._reactions)
+
+    def __contains__(self, emoji):
+        return _key(emoji) in self._reactions
+
+    def get(self, emoji):
+        return self._reactions.get(_key(emoji))
+
+    def users(self, emoji):
+        """Ids of the users known to have reacted with ``emoji``."""
+        return frozenset(self._users.get(_key(emoji), ()))
+
+    def reacted(self, emoji, user_id):
+        users = self._users.get(_key(emoji))
+        return users is not None and user_id in users
+
+    def add(self, emoji, user_id, *, me=False):
+        """Adds a reaction, returning ``None`` if the user already reacted."""
+        key = _key(emoji)
+        try:
+            users = self._users[key]
+        except KeyError:
+            reaction = discord.Reaction(
+                message=self.message, data={'me': me}, emoji=emoji)
+            self._reactions[key] = reaction
+            self._users[key] = {user_id}
+            return reaction
+
+        if user_id in users:
+            return None
+
+        users.add(user_id)
+        reaction = self._reactions[key]
+        reaction.count += 1
+        if me:
+            reaction.me = True
+        return reaction
+
+    def remove(self, emoji, user_id, *, me=False):
+        """Removes a reaction, returning ``None`` if there was nothing to remove.
+
+        Reactions that came with the message payload only carry a count, so
+        users that are not known to have reacted still bring it down.
+        """
+        key = _key(emoji)
+        reaction = self._reactions.get(key)
+        if reaction is None:
+            return None
+
+        users = self._users[key]
+        if user_id in users:
+            users.discard(user_id)
+        elif reaction.count <= len(users):
+            return None
+
+        reaction.count -= 1
+        if me:
+            reaction.me = False
+        if reaction.count == 0:
+            del self._reactions[key]
+            del self._users[key]
+        return reaction
+
+    def clear(self):
+        self._reactions.clear()
+        self._users.clear()
+
+
+def _resolve_user(message, user_id):
+    guild = message.guild
+    user = guild.get_member(user_id) if guild is not None else None
+    if user is None:
+        user = message._state.get_user(user_id)
+    return user if user is not None else discord.Object(id=user_id)
+
+
+def _apply(events, dispatch):
+    applied = 0
+    for message, emoji, user_id, added in events:
+        me = user_id == message._state.self_id
+        store = message._reactions
+        if added:
+            reaction = store.add(emoji, user_id, me=me)
+        else:
+            reaction = store.remove(emoji, user_id, me=me)
+
+        if reaction is None:
+            continue
+
+        applied += 1
+        if dispatch is not None:
+            event = 'reaction_add' if added else 'reaction_remove'
+            dispatch(event, reaction, _resolve_user(message, user_id))
+    return applied
+
+
+def inject(events, *, dispatch=None):
+    """Applies a batch of ``(message, emoji, user_id, added)`` reaction events.
+
+    ``dispatch`` is called like :meth:`discord.Client.dispatch` for every
+    event that changed a message, so ``bot.dispatch`` can be passed to
+    drive reaction listeners. Returns how many events changed a message.
+    """
+    return _apply(events, dispatch)
+
+
+@asyncio.coroutine
+def stream(events, *, rate=None, batch=100, dispatch=None):
+    """Like :func:`inject`, but yields to the event loop after every batch.
+
+    With ``rate`` set, events are paced to roughly that many per second so
+    the listeners scheduled by ``dispatch`` get to run in between.
+    """
+    loop = asyncio.get_event_loop()
+    events = iter(events)
+    applied = 0
+    start = loop.time()
+    sent = 0
+    while True:
+        chunk = [e for _, e in zip(range(batch), events)]
+        if not chunk:
+            return applied
+
+        applied += _apply(chunk, dispatch)
+        sent += len(chunk)
+        delay = 0
+        if rate is not None:
+            delay = max(0, start + sent / rate - loop.time())
+        yield from asyncio.sleep(delay)
@@ -0,0 +1,181 @@
+# Stdlib
+import collections
+import datetime
+import re
+
+# External Libraries
+import discord
+
+_WORD = re.compile(r'\w+')
+
+_IndexKeys = collections.namedtuple('_IndexKeys',
+                                    'author channel mentions bucket tokens')
+
+
+def _words(content):
+    return {w.lower() for w in _WORD.findall(content or '')}
+
+
+def _snowflake(value, *, high=False):
+    if isinstance(value, datetime.datetime):
+        return discord.utils.time_snowflake(value, high=high)
+    return getattr(value, 'id', value)
+
+
+def _id(value):
+    return getattr(value, 'id', value)
+
+
+class MessageIndex:
+    """Optional index over fake message histories.
+
+    Messages are indexed by author, channel, mentioned user, time bucket
+    (derived from the snowflake, ``bucket`` seconds wide) and by the words
+    of their content, so queries intersect a few sets instead of scanning
+    every message.
+    """
+
+    def __init__(self, messages=(), *, bucket=3600):
+        self._bucket_ms = bucket * 1000
+        self._messages = {}
+        self._keys = {}
+        self._authors = collections.defaultdict(set)
+        self._channels = collections.defaultdict(set)
+        self._mentions = collections.defaultdict(set)
+        self._buckets = collections.defaultdict(set)
+        self._words = collections.defaultdict(set)
+        for message in messages:
+            self.add(message)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __contains__(self, message):
+        return _id(message) in self._messages
+
+    def _bucket(self, message_id):
+        return (message_id >> 22) // self._bucket_ms
+
+    def add(self, message):
+        if message.id in self._messages:
+            self.remove(message)
+
+        message_id = message.id
+        author = getattr(message, 'author', None)
+        keys = _IndexKeys(
+            author=author.id if author is not None else None,
+            channel=message.channel.id,
+            mentions=frozenset(m.id for m in getattr(message, 'mentions', ())),
+            bucket=self._bucket(message_id),
+            tokens=frozenset(_words(message.content)))
+
+        self._messages[message_id] = message
+        self._keys[message_id] = keys
+        self._authors[keys.author].add(message_id)
+        self._channels[keys.channel].add(message_id)
+        self._buckets[keys.bucket].add(message_id)
+        for user_id in keys.mentions:
+            self._mentions[user_id].add(message_id)
+        for word in keys.tokens:
+            self._words[word].add(message_id)
+
+    update = add
+
+    def remove(self, message):
+        message_id = _id(message)
+        keys = self._keys.pop(message_id, None)
+        if keys is None:
+            return
+
+        del self._messages[message_id]
+        self._discard(self._authors, keys.author, message_id)
+        self._discard(self._channels, keys.channel, message_id)
+        self._discard(self._buckets, keys.bucket, message_id)
+        for user_id in keys.mentions:
+            self._discard(self._mentions, user_id, message_id)
+        for word in keys.tokens:
+            self._discard(self._words, word, message_id)
+
+    @staticmethod
+    def _discard(index, key, message_id):
+        ids = index[key]
+        ids.discard(message_id)
+        if not ids:
+            del index[key]
+
+    def _range(self, after, before):
+        low = self._bucket(after) if after is not None else None
+        high = self._bucket(before) if before is not None else None
+        ids = set()
+        for bucket, bucket_ids in self._buckets.items():
+            if (low is None or bucket >= low) and (high is None or bucket <= high):
+                ids.update(bucket_ids)
+        return ids
+
+    def query(self,
+              *,
+              author=None,
+              channel=None,
+              mentions=None,
+              content=None,
+              before=None,
+              after=None,
+              limit=None,
+              offset=0,
+              reverse=False):
+        """Returns the matching messages in snowflake order.
+
+        ``content`` matches messages containing every one of its words,
+        case insensitively, like Discord's search does. ``before`` and
+        ``after`` take snowflakes, datetimes or anything with an id and
+        are exclusive.
+        """
+        candidates = []
+        if author is not None:
+            candidates.append(self._authors.get(_id(author), set()))
+        if channel is not None:
+            candidates.append(self._channels.get(_id(channel), set()))
+        if mentions is not None:
+            candidates.append(self._mentions.get(_id(mentions), set()))
+        if content is not None:
+            words = _words(content)
+            if not words:
+                return []
+            candidates.extend(self._words.get(w, set()) for w in words)
+
+        before = _snowflake(before) if before is not None else None
+        after = _snowflake(after, high=True) if after is not None else None
+        if not candidates:
+            if before is None and after is None:
+                candidates.append(self._messages.keys())
+            else:
+                candidates.append(self._range(after, before))
+
+        candidates.sort(key=len)
+        ids = set(candidates[0])
+        for other in candidates[1:]:
+            ids.intersection_update(other)
+            if not ids:
+                return []
+
+        if before is not None or after is not None:
+            ids = [
+                i for i in ids
+                if (before is None or i < before) and (after is None or i > after)
+            ]
+
+        ordered = sorted(ids, reverse=reverse)
+        end = None if limit is None else offset + limit
+        return [self._messages[i] for i in ordered[offset:end]]
+
+    def search(self, *, limit=25, offset=0, **filters):
+        """Emulates the payload shape of Discord's message search endpoint.
+
+        Results are newest first and every hit is wrapped in a list, as
+        Discord returns each hit with its surrounding context messages.
+        """
+        hits = self.query(reverse=True, **filters)
+        return {
+            'total_results': len(hits),
+            'messages': [[m] for m in hits[offset:offset + limit]]
+        }
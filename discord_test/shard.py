@@ -0,0 +1,133 @@
+# Stdlib
+import asyncio
+import concurrent.futures
+import copy
+
+# discord.py-test
+from discord_test import Guild, ConnectionState
+
+
+class ShardStats:
+    """Event throughput and latency of one fake shard run."""
+
+    def __init__(self, shard_id):
+        self.shard_id = shard_id
+        self.guilds = 0
+        self.events = 0
+        self.elapsed = 0.0
+        self.latencies = []
+
+    def __repr__(self):
+        return '<ShardStats shard_id={0.shard_id} events={0.events} ' \
+               'throughput={0.throughput:.1f}>'.format(self)
+
+    @property
+    def throughput(self):
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    def latency(self, percentile=50):
+        """Latency in seconds at ``percentile``, from arrival to handled."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+    def to_dict(self):
+        return {
+            'shard_id': self.shard_id,
+            'guilds': self.guilds,
+            'events': self.events,
+            'elapsed': self.elapsed,
+            'throughput': self.throughput,
+            'p50': self.latency(50),
+            'p99': self.latency(99),
+            'max': max(self.latencies) if self.latencies else 0.0
+        }
+
+
+@asyncio.coroutine
+def _drive(loop, guilds, events, handler, rate, stats):
+    start = loop.time()
+    for index, (guild_id, event, data) in enumerate(events):
+        # events arrive at a steady rate, or all at once without one
+        arrival = start + index / rate if rate else start
+        delay = arrival - loop.time()
+        if delay > 0:
+            yield from asyncio.sleep(delay)
+
+        yield from handler(guilds.get(guild_id), event, data)
+        stats.latencies.append(loop.time() - arrival)
+
+    stats.events = len(stats.latencies)
+    stats.elapsed = loop.time() - start
+
+
+def _run_shard(shard_id, shard_count, payloads, events, handler, rate):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        state = ConnectionState(shard_count=shard_count)
+        guilds = {}
+        for data in payloads:
+            guild = Guild(data=copy.deepcopy(data), state=state)
+            guilds[guild.id] = guild
+
+        stats = ShardStats(shard_id)
+        stats.guilds = len(guilds)
+        loop.run_until_complete(
+            _drive(loop, guilds, events, handler, rate, stats))
+        return stats
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+
+class ShardCluster:
+    """Partitions fake guilds across shards the way Discord does.
+
+    A guild belongs to shard ``(guild_id >> 22) % shard_count``. Every
+    shard runs on its own event loop, in a thread or a process of its
+    own, and builds its guilds from their payloads there.
+    """
+
+    def __init__(self, shard_count):
+        self.shard_count = shard_count
+        self._payloads = [[] for _ in range(shard_count)]
+
+    def shard_for(self, guild_id):
+        return (guild_id >> 22) % self.shard_count
+
+    def add_guilds(self, payloads):
+        for data in payloads:
+            self._payloads[self.shard_for(int(data['id']))].append(data)
+
+    def guild_counts(self):
+        return [len(payloads) for payloads in self._payloads]
+
+    def partition(self, events):
+        """Splits ``(guild_id, event, data)`` tuples by shard, keeping order."""
+        ret = [[] for _ in range(self.shard_count)]
+        for e in events:
+            ret[self.shard_for(e[0])].append(e)
+        return ret
+
+    def run(self, handler, events, *, processes=False, rate=None):
+        """Feeds the events to ``handler`` on every shard, returning their stats.
+
+        ``handler`` is a coroutine function called with the guild, the
+        event name and its data. With ``processes`` set, shards run in
+        separate processes and the handler and events must be picklable.
+        ``rate`` paces the events of every shard to that many per second.
+        """
+        executor_type = concurrent.futures.ProcessPoolExecutor if processes \
+            else concurrent.futures.ThreadPoolExecutor
+        partitioned = self.partition(events)
+        with executor_type(max_workers=self.shard_count) as executor:
+            futures = [
+                executor.submit(_run_shard, shard_id, self.shard_count,
+                                self._payloads[shard_id], partitioned[shard_id],
+                                handler, rate)
+                for shard_id in range(self.shard_count)
+            ]
+            return [f.result() for f in futures]
@@ -0,0 +1,169 @@
+# Stdlib
+import collections
+import time
+import weakref
+
+# External Libraries
+import discord
+
+# discord.py-test
+from discord_test import CDN, User, Outbox, DMChannel, GroupChannel, WebhookStore
+
+
+def _user_data(user):
+    return {
+        'id': user.id,
+        'username': user.name,
+        'discriminator': user.discriminator,
+        'avatar': user.avatar,
+        'bot': user.bot
+    }
+
+
+class ConnectionState:
+    """Stand-in for discord.py's connection state shared by the fakes.
+
+    Users are interned by id and only weakly referenced, so a user that is
+    a member of several fake guilds is stored once and dropped as soon as
+    the last member pointing at it goes away.
+
+    Private channels are kept like discord.py does, with DM channels also
+    indexed by recipient id. Unlike discord.py, which keeps only the last
+    128 for bots, the fake keeps all of them so broadcasts can be checked.
+    """
+
+    def __init__(self, *, user=None, shard_count=None, trace=None):
+        self._users = weakref.WeakValueDictionary()
+        self.shard_count = shard_count
+        self._last_millis = 0
+        self._increment = 0
+        self._private_channels = collections.OrderedDict()
+        self._private_channels_by_user = {}
+        self.cdn = CDN()
+        self.webhooks = WebhookStore(self)
+        self.outbox = Outbox(self)
+        # a TraceRecorder, see discord_test.trace
+        self.trace = trace
+        self.user = None if user is None else discord.ClientUser(
+            state=self, data=user)
+
+    @property
+    def self_id(self):
+        u = self.user
+        return u.id if u else None
+
+    def snowflake(self):
+        """Returns a new, increasing snowflake for objects the fakes create."""
+        millis = int(time.time() * 1000) - discord.utils.DISCORD_EPOCH
+        if millis > self._last_millis:
+            self._last_millis = millis
+            self._increment = 0
+        else:
+            self._increment += 1
+            if self._increment >= 4096:
+                self._last_millis += 1
+                self._increment = 0
+        return (self._last_millis << 22) | self._increment
+
+    @property
+    def users(self):
+        return list(self._users.values())
+
+    def store_user(self, data):
+        user_id = int(data['id'])
+        try:
+            return self._users[user_id]
+        except KeyError:
+            user = User(state=self, data=data)
+            self._users[user_id] = user
+            return user
+
+    def store_users(self, users):
+        """Interns a batch of user payloads, returning them in order.
+
+        The caller has to hold on to the result, the store itself keeps
+        the users alive only as long as something else references them.
+        """
+        get = self._users.get
+        batch = {}
+        ret = []
+        for data in users:
+            user_id = int(data['id'])
+            user = batch.get(user_id) or get(user_id)
+            if user is None:
+                user = batch[user_id] = User(state=self, data=data)
+            ret.append(user)
+
+        self._users.update(batch)
+        return ret
+
+    def get_user(self, user_id):
+        return self._users.get(user_id)
+
+    @property
+    def private_channels(self):
+        return list(self._private_channels.values())
+
+    def _get_private_channel(self, channel_id):
+        try:
+            value = self._private_channels[channel_id]
+        except KeyError:
+            return None
+        else:
+            self._private_channels.move_to_end(channel_id)
+            return value
+
+    def _get_private_channel_by_user(self, user_id):
+        return self._private_channels_by_user.get(user_id)
+
+    def _add_private_channel(self, channel):
+        self._private_channels[channel.id] = channel
+        if isinstance(channel, DMChannel):
+            self._private_channels_by_user[channel.recipient.id] = channel
+
+    def _remove_private_channel(self, channel):
+        self._private_channels.pop(channel.id, None)
+        if isinstance(channel, DMChannel):
+            self._private_channels_by_user.pop(channel.recipient.id, None)
+
+    def add_dm_channel(self, data):
+        channel = DMChannel(me=self.user, state=self, data=data)
+        self._add_private_channel(channel)
+        return channel
+
+    def add_group_channel(self, data):
+        channel = GroupChannel(me=self.user, state=self, data=data)
+        self._add_private_channel(channel)
+        return channel
+
+    def create_dm(self, user):
+        """Returns the DM channel with ``user``, creating it the first time."""
+        found = self._private_channels_by_user.get(user.id)
+        if found is not None:
+            return found
+
+        return self.add_dm_channel({
+            'id': self.snowflake(),
+            'type': 1,
+            'recipients': [_user_data(user)]
+        })
+
+    def create_group(self, *users, name=None):
+        data = {
+            'id': self.snowflake(),
+            'type': 3,
+            'name': name,
+            'icon': None,
+            'owner_id': self.self_id,
+            'recipients': [_user_data(u) for u in users]
+        }
+        return self.add_group_channel(data)
+
+    def get_reaction_emoji(self, data):
+        emoji_id = discord.utils._get_as_snowflake(data, 'id')
+        if not emoji_id:
+            return data['name']
+        return discord.PartialEmoji(
+            animated=data.get('animated', False),
+            id=emoji_id,
+            name=data['name'])
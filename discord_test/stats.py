@@ -0,0 +1,223 @@
+# Stdlib
+import functools
+import json
+import time
+
+_clock = time.perf_counter
+
+# classes registered through instrumented(), as (class, attribute names)
+_targets = []
+
+# probes currently patched into classes, as (class, name, original, owned)
+_installed = []
+
+_probes = {}
+
+
+class Probe:
+    __slots__ = ('name', 'calls', 'total', 'max')
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def __repr__(self):
+        return '<Probe name={0.name!r} calls={0.calls} total={0.total:.6f}>'.format(
+            self)
+
+    def reset(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    @property
+    def mean(self):
+        return self.total / self.calls if self.calls else 0.0
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'total': self.total,
+            'mean': self.mean,
+            'max': self.max
+        }
+
+
+class _ProbedDescriptor:
+    # Wraps non-property descriptors such as cached_slot_property.
+    # Cache hits are counted as well, they just cost next to nothing.
+    __slots__ = ('descriptor', 'probe')
+
+    def __init__(self, descriptor, probe):
+        self.descriptor = descriptor
+        self.probe = probe
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.descriptor.__get__(instance, owner)
+
+        start = _clock()
+        try:
+            return self.descriptor.__get__(instance, owner)
+        finally:
+            self.probe.add(_clock() - start)
+
+
+def _wrap_function(func, probe):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = _clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            probe.add(_clock() - start)
+
+    return wrapper
+
+
+def _wrap(attr, probe):
+    if isinstance(attr, property):
+        return property(
+            _wrap_function(attr.fget, probe), attr.fset, attr.fdel,
+            attr.__doc__)
+    if isinstance(attr, (staticmethod, classmethod)):
+        return type(attr)(_wrap_function(attr.__func__, probe))
+    if hasattr(attr, '__get__') and not callable(attr):
+        return _ProbedDescriptor(attr, probe)
+    return _wrap_function(attr, probe)
+
+
+def _lookup(cls, name):
+    for klass in cls.__mro__:
+        try:
+            return klass.__dict__[name]
+        except KeyError:
+            continue
+    raise AttributeError('{0.__name__} has no attribute {1!r}'.format(
+        cls, name))
+
+
+def get_probe(name):
+    try:
+        return _probes[name]
+    except KeyError:
+        probe = _probes[name] = Probe(name)
+        return probe
+
+
+def _install(cls, names):
+    for name in names:
+        original = _lookup(cls, name)
+        probe = get_probe('{0.__name__}.{1}'.format(cls, name))
+        _installed.append((cls, name, original, name in cls.__dict__))
+        setattr(cls, name, _wrap(original, probe))
+
+
+def instrumented(*names):
+    """Class decorator registering hot attributes of a fake for profiling.
+
+    Nothing is patched until :func:`enable` is called, so registered
+    classes run at full speed while profiling is off.
+    """
+
+    def decorator(cls):
+        _targets.append((cls, names))
+        if _installed:
+            _install(cls, names)
+        return cls
+
+    return decorator
+
+
+def is_enabled():
+    return bool(_installed)
+
+
+def enable():
+    if _installed:
+        return
+
+    for cls, names in _targets:
+        _install(cls, names)
+
+
+def disable():
+    while _installed:
+        cls, name, original, owned = _installed.pop()
+        if owned:
+            setattr(cls, name, original)
+        else:
+            delattr(cls, name)
+
+
+def reset():
+    for probe in _probes.values():
+        probe.reset()
+
+
+def snapshot():
+    """Returns a mapping of probe name to its counters, skipping idle probes."""
+    return {
+        name: probe.to_dict()
+        for name, probe in _probes.items() if probe.calls
+    }
+
+
+def report(data=None, *, sort='total'):
+    if data is None:
+        data = snapshot()
+
+    rows = sorted(data.items(), key=lambda t: t[1][sort], reverse=True)
+    width = max([len(name) for name in data] + [len('probe')])
+    lines = [
+        '{0:<{1}}  {2:>10}  {3:>12}  {4:>12}  {5:>12}'.format(
+            'probe', width, 'calls', 'total (s)', 'mean (us)', 'max (us)')
+    ]
+    for name, row in rows:
+        lines.append('{0:<{1}}  {2:>10}  {3:>12.6f}  {4:>12.2f}  {5:>12.2f}'.format(
+            name, width, row['calls'], row['total'], row['mean'] * 1e6,
+            row['max'] * 1e6))
+    return '\n'.join(lines)
+
+
+class profile:
+    """Context manager collecting the probes of a single run or test.
+
+    Counters are reset on entry and captured in :attr:`stats` on exit.
+    Profiling is switched back off afterwards unless it was already on.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.stats = {}
+        self._was_enabled = False
+
+    def __enter__(self):
+        self._was_enabled = is_enabled()
+        enable()
+        reset()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats = snapshot()
+        if not self._was_enabled:
+            disable()
+
+    def report(self, *, sort='total'):
+        return report(self.stats, sort=sort)
+
+    def to_dict(self):
+        return {'name': self.name, 'probes': self.stats}
+
+    def dump(self, fp):
+        if isinstance(fp, str):
+            with open(fp, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        else:
+            json.dump(self.to_dict(), fp, indent=2, sort_keys=True)
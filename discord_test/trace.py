@@ -0,0 +1,337 @@
+"""Compact binary traces of the calls a bot makes against the fakes.
+
+Set ``state.trace`` to a :class:`TraceRecorder` and every mutating
+coroutine decorated with :func:`traced` appends a record. A record is a
+fixed header, the marshalled arguments and the snowflakes among them::
+
+    uint32 payload size, float64 timestamp, uint16 op code,
+    uint64 target id, uint16 snowflake count
+    payload, with every snowflake replaced by ``...``
+    uint64 snowflakes, in the order of the ``...`` they replace
+
+Keeping the snowflakes apart lets :func:`diff` renumber them without
+decoding the payloads. Op names are written once per recorder as
+definition records (op code 0), so several runs can append to one file.
+Compare two traces with :func:`diff`, or from the command line::
+
+    python -m discord_test.trace golden.trace run.trace
+"""
+# Stdlib
+import asyncio
+import collections
+import datetime
+import difflib
+import enum
+import functools
+import marshal
+import struct
+import sys
+import time
+
+_MAGIC = b'DTTRACE2'
+_HEADER = struct.Struct('<IdHQH')
+_DEFINE = 0
+# marshal from version 3 on emits back references depending on object
+# identity, which would make equal calls encode differently
+_MARSHAL_VERSION = 2
+# ints this large are taken for snowflakes
+_SNOWFLAKE_MIN = 1 << 32
+
+TraceRecord = collections.namedtuple('TraceRecord',
+                                     'timestamp op target args kwargs')
+TraceHunk = collections.namedtuple('TraceHunk', 'tag a_index a b_index b')
+
+_ids_structs = {}
+
+
+def _ids_struct(count):
+    try:
+        return _ids_structs[count]
+    except KeyError:
+        ret = _ids_structs[count] = struct.Struct('<%dQ' % count)
+        return ret
+
+
+def _plain(value, ids):
+    """Reduces ``value`` to types marshal takes, moving snowflakes to ``ids``."""
+    kind = type(value)
+    if kind is int:
+        if value >= _SNOWFLAKE_MIN:
+            ids.append(value)
+            return ...
+        return value
+    if value is None or kind in (bool, float, str, bytes):
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple([_plain(v, ids) for v in value])
+    if isinstance(value, dict):
+        # keys stay as they are, a dict can't hold several ... keys
+        return {_plain(k, []): _plain(v, ids) for k, v in value.items()}
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+
+    # models by id, embeds by content, permissions and colours by value
+    ident = getattr(value, 'id', None)
+    if isinstance(ident, int):
+        return _plain(ident, ids)
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is not None:
+        return _plain(to_dict(), ids)
+    number = getattr(value, 'value', None)
+    if isinstance(number, int):
+        return number
+    pair = getattr(value, 'pair', None)
+    if pair is not None:
+        # permission overwrites
+        return tuple(p.value for p in pair())
+    return repr(value)
+
+
+def _restore(value, ids):
+    if value is ...:
+        return next(ids)
+    if type(value) is tuple:
+        return tuple([_restore(v, ids) for v in value])
+    if type(value) is dict:
+        return {k: _restore(v, ids) for k, v in value.items()}
+    return value
+
+
+class TraceRecorder:
+    """Appends call records to a file or to memory.
+
+    ``path`` is opened in append mode, a file object is written as is and
+    without either the trace is kept in memory, see :meth:`getvalue`.
+    Records are buffered and written in ``flush_size`` byte batches.
+    """
+
+    def __init__(self, path=None, *, flush_size=1 << 16):
+        self.flush_size = flush_size
+        self.count = 0
+        self._codes = {}
+        self._buffer = bytearray()
+        self._memory = None
+        self._owns_file = False
+        if path is None:
+            self._file = None
+            self._memory = bytearray(_MAGIC)
+        elif isinstance(path, str):
+            self._file = open(path, 'ab')
+            self._owns_file = True
+            if self._file.tell() == 0:
+                self._buffer += _MAGIC
+        else:
+            self._file = path
+            self._buffer += _MAGIC
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _define(self, op):
+        code = len(self._codes) + 1
+        self._codes[op] = code
+        payload = marshal.dumps(op, _MARSHAL_VERSION)
+        self._buffer += _HEADER.pack(len(payload), 0.0, _DEFINE, code, 0) + payload
+        return code
+
+    def record(self, op, target=None, args=(), kwargs=None):
+        code = self._codes.get(op)
+        if code is None:
+            code = self._define(op)
+
+        ids = []
+        payload = marshal.dumps(
+            (_plain(args, ids), _plain(kwargs, ids) if kwargs else None),
+            _MARSHAL_VERSION)
+        buffer = self._buffer
+        buffer += _HEADER.pack(
+            len(payload), time.time(), code, target or 0, len(ids))
+        buffer += payload
+        if ids:
+            buffer += _ids_struct(len(ids)).pack(*ids)
+        self.count += 1
+        if len(buffer) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if self._memory is not None:
+            self._memory += self._buffer
+        elif self._file is not None:
+            self._file.write(self._buffer)
+            self._file.flush()
+        self._buffer = bytearray()
+
+    def getvalue(self):
+        """The trace so far as bytes, for in-memory recorders."""
+        self.flush()
+        return bytes(self._memory) if self._memory is not None else None
+
+    def close(self):
+        self.flush()
+        if self._owns_file:
+            self._file.close()
+        self._file = None
+        self._owns_file = False
+
+
+def traced(func):
+    """Records calls of a mutating coroutine in ``self._state.trace``.
+
+    Apply it on top of ``asyncio.coroutine``. With no recorder set, the
+    cost is one attribute lookup per call.
+    """
+    op = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        trace = self._state.trace
+        if trace is not None:
+            trace.record(op, self.id, args, kwargs)
+        return (yield from func(self, *args, **kwargs))
+
+    return asyncio.coroutine(wrapper)
+
+
+def _raw(source):
+    if isinstance(source, TraceRecorder):
+        return source.getvalue()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _raw_records(data):
+    """Yields ``(timestamp, op, target, payload, snowflakes)`` per record."""
+    if not data.startswith(_MAGIC):
+        raise ValueError('not a discord_test trace')
+
+    names = {}
+    unpack = _HEADER.unpack_from
+    size = _HEADER.size
+    offset = len(_MAGIC)
+    end = len(data)
+    while offset < end:
+        # a file appended to by several recorders has several headers
+        if data.startswith(_MAGIC, offset):
+            offset += len(_MAGIC)
+            continue
+
+        length, timestamp, code, target, count = unpack(data, offset)
+        offset += size
+        payload = data[offset:offset + length]
+        offset += length
+        if count:
+            snowflakes = _ids_struct(count).unpack_from(data, offset)
+            offset += count * 8
+        else:
+            snowflakes = ()
+
+        if code == _DEFINE:
+            names[target] = marshal.loads(payload)
+        else:
+            yield timestamp, names[code], target, payload, snowflakes
+
+
+def _decode(timestamp, op, target, payload, snowflakes):
+    args, kwargs = _restore(marshal.loads(payload), iter(snowflakes))
+    return TraceRecord(timestamp, op, target or None, args, kwargs or {})
+
+
+def read(source):
+    """Yields the :class:`TraceRecord` of a trace file, bytes or recorder."""
+    for raw in _raw_records(_raw(source)):
+        yield _decode(*raw)
+
+
+def _keys(records, renumber):
+    if not renumber:
+        return [(op, target, payload, snowflakes)
+                for _, op, target, payload, snowflakes in records]
+
+    # snowflakes become -1, -2, ... in the order they first appear in,
+    # which never collides with a real id
+    ids = {}
+    ret = []
+    for _, op, target, payload, snowflakes in records:
+        if target >= _SNOWFLAKE_MIN:
+            target = ids.setdefault(target, ~len(ids))
+        ret.append((op, target, payload,
+                    tuple([ids.setdefault(i, ~len(ids)) for i in snowflakes])))
+    return ret
+
+
+def diff(a, b, *, renumber=True):
+    """Compares two traces, ignoring timestamps.
+
+    Returns a list of :class:`TraceHunk` for the differing runs of records,
+    empty when the traces match. With ``renumber``, snowflakes are replaced
+    by the order they first appear in, so ids the fakes generate from the
+    clock don't count as differences between runs.
+    """
+    raw_a = list(_raw_records(_raw(a)))
+    raw_b = list(_raw_records(_raw(b)))
+    keys_a, keys_b = _keys(raw_a, renumber), _keys(raw_b, renumber)
+    if keys_a == keys_b:
+        return []
+
+    # only the middle that differs goes through the sequence matcher
+    start = 0
+    limit = min(len(keys_a), len(keys_b))
+    while start < limit and keys_a[start] == keys_b[start]:
+        start += 1
+    end_a, end_b = len(keys_a), len(keys_b)
+    while end_a > start and end_b > start and keys_a[end_a - 1] == keys_b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+
+    matcher = difflib.SequenceMatcher(
+        None, keys_a[start:end_a], keys_b[start:end_b], autojunk=False)
+    ret = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        i1, i2, j1, j2 = i1 + start, i2 + start, j1 + start, j2 + start
+        ret.append(
+            TraceHunk(tag, i1, [_decode(*r) for r in raw_a[i1:i2]], j1,
+                      [_decode(*r) for r in raw_b[j1:j2]]))
+    return ret
+
+
+def _format(record):
+    args = ', '.join(map(repr, record.args))
+    kwargs = ', '.join('%s=%r' % item for item in sorted(record.kwargs.items()))
+    return '{0.op}[{0.target}]({1})'.format(
+        record, ', '.join(filter(None, (args, kwargs))))
+
+
+def main(argv=None):
+    import argparse
+
+    p = argparse.ArgumentParser(description='Diff two discord_test traces.')
+    p.add_argument('golden')
+    p.add_argument('trace')
+    p.add_argument(
+        '--exact-ids',
+        action='store_true',
+        help='compare snowflakes as they are instead of renumbering them')
+    args = p.parse_args(argv)
+
+    hunks = diff(args.golden, args.trace, renumber=not args.exact_ids)
+    for hunk in hunks:
+        print('@@ -%d,%d +%d,%d @@ %s' % (
+            hunk.a_index, len(hunk.a), hunk.b_index, len(hunk.b), hunk.tag))
+        for record in hunk.a:
+            print('-' + _format(record))
+        for record in hunk.b:
+            print('+' + _format(record))
+    return 1 if hunks else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
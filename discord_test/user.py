@@ -0,0 +1,30 @@
+# Stdlib
+import asyncio
+
+# External Libraries
+import discord
+
+# discord.py-test
+from discord_test import Messageable
+
+
+class User(Messageable, discord.User):
+    # the user store only keeps weak references to its users
+    __slots__ = () if hasattr(discord.User, '__weakref__') else ('__weakref__',)
+
+    def __repr__(self):
+        return '<User id={0.id} name={0.name!r} discriminator={0.discriminator!r}' \
+               ' bot={0.bot}>'.format(self)
+
+    @asyncio.coroutine
+    def _get_channel(self):
+        ch = yield from self.create_dm()
+        return ch
+
+    @property
+    def dm_channel(self):
+        return self._state._get_private_channel_by_user(self.id)
+
+    @asyncio.coroutine
+    def create_dm(self):
+        return self._state.create_dm(self)
@@ -0,0 +1,65 @@
+# Stdlib
+import collections.abc
+import itertools
+
+
+class ModelView(collections.abc.Sequence):
+    """Read-only, live view of the models of an id keyed dict.
+
+    Iterating, ``len`` and membership by id or by model don't copy
+    anything, unlike the lists discord.py hands out. Since the view is
+    live, take a :meth:`snapshot` before changing what it shows while
+    iterating, say to kick members of ``guild.members`` one by one.
+    Indexing works, but walks the models up to the index. Views compare
+    equal to any sequence of the same models in the same order.
+    """
+    __slots__ = ('_data', )
+
+    def __init__(self, data):
+        self._data = data
+
+    def __repr__(self):
+        return '<{0.__class__.__name__} len={1}>'.format(self, len(self._data))
+
+    def __eq__(self, other):
+        # compares like the list it replaces, with any sequence of models
+        if isinstance(other, (str, bytes)) or not isinstance(other, collections.abc.Sequence):
+            return NotImplemented
+        if len(self._data) != len(other):
+            return False
+        return all(a == b for a, b in zip(self._data.values(), other))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data.values())
+
+    def __reversed__(self):
+        return reversed(self.snapshot())
+
+    def __contains__(self, item):
+        return getattr(item, 'id', item) in self._data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.snapshot()[index]
+        if index < 0:
+            index += len(self._data)
+        if not 0 <= index < len(self._data):
+            raise IndexError('view index out of range')
+        return next(itertools.islice(self._data.values(), index, None))
+
+    def index(self, value, start=0, stop=None):
+        # the Sequence mixin would index its way through, quadratically
+        for i, item in enumerate(itertools.islice(self._data.values(), start, stop), start):
+            if item is value or item == value:
+                return i
+        raise ValueError('{0!r} is not in view'.format(value))
+
+    def get(self, model_id):
+        return self._data.get(model_id)
+
+    def snapshot(self):
+        """The models as a list, for callers that need a copy."""
+        return list(self._data.values())
@@ -0,0 +1,293 @@
+# Stdlib
+import asyncio
+import collections
+import hashlib
+import time
+
+# External Libraries
+import discord
+
+# discord.py-test
+from discord_test import Message
+from discord_test.abc import _files
+
+SentWebhookMessage = collections.namedtuple(
+    'SentWebhookMessage', 'webhook_id channel_id timestamp content username '
+    'avatar_url tts embeds attachments')
+
+
+class _Bucket:
+    # generic cell rate algorithm, requests reserve their slot in order
+    __slots__ = ('interval', 'tolerance', '_tat')
+
+    def __init__(self, rate, per):
+        self.interval = per / rate
+        self.tolerance = per - self.interval
+        self._tat = 0.0
+
+    def reserve(self, now):
+        """Takes the next free slot and returns how long to wait for it."""
+        tat = max(self._tat, now)
+        self._tat = tat + self.interval
+        return max(0.0, tat - self.tolerance - now)
+
+
+class WebhookCapture:
+    """Bounded ring buffer of the messages sent through fake webhooks.
+
+    Sends are indexed by content and by embed field ``(name, value)`` so
+    that assertions don't have to scan the buffer, and evicted sends are
+    dropped from the indexes as they fall out. Uploaded files are read into
+    the fake CDN and kept on each send as attachment payloads.
+    """
+
+    def __init__(self, maxlen=10000):
+        self.maxlen = maxlen
+        self.sent = 0
+        self._entries = collections.deque()
+        self._by_content = {}
+        self._by_field = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    @staticmethod
+    def _fields(entry):
+        return {(f.name, f.value) for e in entry.embeds for f in e.fields}
+
+    def _index(self, index, key, entry):
+        try:
+            index[key].append(entry)
+        except KeyError:
+            index[key] = collections.deque((entry, ))
+
+    def _unindex(self, index, key):
+        entries = index[key]
+        entries.popleft()
+        if not entries:
+            del index[key]
+
+    def record(self, entry):
+        if len(self._entries) >= self.maxlen:
+            old = self._entries.popleft()
+            self._unindex(self._by_content, old.content)
+            for key in self._fields(old):
+                self._unindex(self._by_field, key)
+
+        self._entries.append(entry)
+        self._index(self._by_content, entry.content, entry)
+        for key in self._fields(entry):
+            self._index(self._by_field, key, entry)
+        self.sent += 1
+        return entry
+
+    def with_content(self, content):
+        return list(self._by_content.get(content, ()))
+
+    def with_field(self, name, value):
+        return list(self._by_field.get((name, value), ()))
+
+    def count(self, *, content=None, field=None):
+        if content is not None:
+            return len(self._by_content.get(content, ()))
+        if field is not None:
+            return len(self._by_field.get(tuple(field), ()))
+        return len(self._entries)
+
+    def last(self):
+        return self._entries[-1] if self._entries else None
+
+    def throughput(self, window=1.0, *, now=None):
+        """Sends per second over the last ``window`` seconds."""
+        now = time.monotonic() if now is None else now
+        count = 0
+        for entry in reversed(self._entries):
+            if entry.timestamp < now - window:
+                break
+            count += 1
+        return count / window
+
+    def clear(self):
+        self._entries.clear()
+        self._by_content.clear()
+        self._by_field.clear()
+
+
+class WebhookStore:
+    """Fake webhooks of a connection state and the capture of their sends.
+
+    Webhooks aren't rate limited unless ``rate`` is set, in which case
+    every webhook gets ``rate`` sends per ``per`` seconds (Discord allows
+    5 per 2). Sends over the limit wait for their slot in real time, and
+    how many are waiting is exposed as :attr:`queue_depth`.
+    """
+
+    def __init__(self, state, *, maxlen=10000, rate=None, per=2.0):
+        self._state = state
+        self._webhooks = {}
+        self.capture = WebhookCapture(maxlen)
+        self.rate = rate
+        self.per = per
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.rate_limited = 0
+
+    def __iter__(self):
+        return iter(self._webhooks.values())
+
+    def get(self, webhook_id):
+        return self._webhooks.get(webhook_id)
+
+    def for_channel(self, channel_id):
+        return [w for w in self._webhooks.values() if w.channel_id == channel_id]
+
+    def for_guild(self, guild_id):
+        return [w for w in self._webhooks.values() if w.guild_id == guild_id]
+
+    def create(self, channel, *, name=None, avatar=None):
+        state = self._state
+        webhook_id = state.snowflake()
+        data = {
+            'id': webhook_id,
+            'guild_id': channel.guild.id,
+            'channel_id': channel.id,
+            'name': name,
+            'avatar': avatar and hashlib.md5(avatar).hexdigest(),
+            'token': hashlib.sha1(str(webhook_id).encode()).hexdigest()
+        }
+        webhook = self._webhooks[webhook_id] = Webhook(
+            data, channel=channel, store=self)
+        return webhook
+
+    def remove(self, webhook):
+        self._webhooks.pop(webhook.id, None)
+
+    def metrics(self):
+        return {
+            'sent': self.capture.sent,
+            'captured': len(self.capture),
+            'throughput': self.capture.throughput(),
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'rate_limited': self.rate_limited
+        }
+
+
+class Webhook(discord.Webhook):
+    __slots__ = ('_channel', '_store', '_bucket')
+
+    def __init__(self, data, *, channel, store):
+        self._store = store
+        self._state = store._state
+        self._adapter = None
+        self._channel = channel
+        self._bucket = _Bucket(store.rate, store.per) if store.rate else None
+        self.id = int(data['id'])
+        self.channel_id = int(data['channel_id'])
+        self.guild_id = discord.utils._get_as_snowflake(data, 'guild_id')
+        self.name = data.get('name')
+        self.avatar = data.get('avatar')
+        self.token = data['token']
+        self.user = self._state.user
+
+    def __repr__(self):
+        return '<Webhook id={0.id!r} name={0.name!r}>'.format(self)
+
+    @property
+    def guild(self):
+        return self._channel.guild
+
+    @property
+    def channel(self):
+        return self._channel
+
+    @asyncio.coroutine
+    def _wait_for_slot(self):
+        if self._bucket is None:
+            return
+
+        store = self._store
+        delay = self._bucket.reserve(time.monotonic())
+        if not delay:
+            return
+
+        store.rate_limited += 1
+        store.queue_depth += 1
+        store.max_queue_depth = max(store.max_queue_depth, store.queue_depth)
+        try:
+            yield from asyncio.sleep(delay)
+        finally:
+            store.queue_depth -= 1
+
+    @asyncio.coroutine
+    def send(self,
+             content=None,
+             *,
+             wait=False,
+             username=None,
+             avatar_url=None,
+             tts=False,
+             file=None,
+             files=None,
+             embed=None,
+             embeds=None):
+        if embed is not None and embeds is not None:
+            raise discord.InvalidArgument(
+                'Cannot mix embed and embeds keyword arguments.')
+        if embed is not None:
+            embeds = [embed]
+        embeds = list(embeds or ())
+        files = _files(file, files)
+        content = str(content) if content is not None else None
+
+        yield from self._wait_for_slot()
+        state = self._state
+        # the attachment payloads, the files themselves are in the fake CDN
+        attachments = [
+            state.cdn.put_attachment(self.channel_id, state.snowflake(), f) for f in files
+        ]
+        self._store.capture.record(
+            SentWebhookMessage(self.id, self.channel_id, time.monotonic(), content,
+                               username, avatar_url, tts, embeds, attachments))
+
+        if wait:
+            return Message(
+                channel=self._channel,
+                data={
+                    'id': state.snowflake(),
+                    'webhook_id': self.id,
+                    'type': 0,
+                    'content': content or '',
+                    'tts': tts,
+                    'embeds': [e.to_dict() for e in embeds],
+                    'attachments': attachments,
+                    'edited_timestamp': None,
+                    'author': {
+                        'id': self.id,
+                        'username': username or self.name or 'Webhook',
+                        'discriminator': '0000',
+                        'avatar': self.avatar,
+                        'bot': True
+                    }
+                })
+
+    @asyncio.coroutine
+    def edit(self, **kwargs):
+        try:
+            self.name = kwargs['name']
+        except KeyError:
+            pass
+
+        try:
+            avatar = kwargs['avatar']
+        except KeyError:
+            pass
+        else:
+            self.avatar = avatar and hashlib.md5(avatar).hexdigest()
+
+    @asyncio.coroutine
+    def delete(self):
+        self._store.remove(self)
@@ -1,8 +1,10 @@
 # External Libraries
 from setuptools import setup, find_packages
 
-# discord.py-test
-from discord_test import misc
+# read the metadata without importing the package, which needs discord.py
+MISC = {}
+with open("discord_test/misc.py") as file:
+    exec(file.read(), MISC)
 
 with open("README.rst") as file:
     README = file.read()
@@ -19,12 +21,14 @@ if __name__ == '__main__':
         maintainer_email="mail@martmists.com",
         license="MIT",
         zip_safe=False,
-        version=misc.__version__,
-        description=misc.description,
+        version=MISC["__version__"],
+        description=MISC["description"],
         long_description=README,
         url="https://github.com/IzunaDevs/discord.py-test",
         packages=find_packages(),
         install_requires=REQUIREMENTS,
+        extras_require={"generator": ["numpy"]},
+        entry_points={"pytest11": ["discord_test = discord_test.plugin"]},
         keywords=["discord", "discord.py", "test", "pytest", "unittest"],
         classifiers=[
             "Development Status :: 2 - Pre-Alpha",